@@ -4,7 +4,13 @@ from fastapi import APIRouter, Depends, HTTPException
 
 from fastapi_service.src.models.film import FilmDetails, Film
 from fastapi_service.src.services.film import FilmService, get_film_service
-from fastapi_service.src.utils.pagination import Pagination
+from fastapi_service.src.utils.pagination import (
+    Pagination,
+    fetch_page,
+    page_response,
+)
+from fastapi_service.src.utils.response import RawJSONResponse
+from fastapi_service.src.utils.serialization import dump_json
 
 router = APIRouter(prefix="/api/v1/films", tags=["FilmService"])
 
@@ -19,10 +25,21 @@ async def get_films(
         sort: str = "-imdb_rating",
         pagination: Pagination = Depends(),
         film_service: FilmService = Depends(get_film_service),
-) -> list[Film]:
-    return await film_service.get_films(
+) -> RawJSONResponse:
+    if pagination.cursor is not None:
+        films, next_cursor = await fetch_page(
+            film_service.get_films_page(
+                sort,
+                pagination.cursor or None,
+                pagination.page_size,
+                genre_id=genre_id,
+            )
+        )
+        return page_response(films, next_cursor, Film)
+    films = await film_service.get_films.raw(
         sort, pagination.page_number, pagination.page_size, genre_id=genre_id
     )
+    return RawJSONResponse(films or b"[]")
 
 
 @router.get(
@@ -34,15 +51,26 @@ async def search_film(
         query: str,
         pagination: Pagination = Depends(),
         film_service: FilmService = Depends(get_film_service),
-) -> list[Film]:
-    films = await film_service.search(
+) -> RawJSONResponse:
+    if pagination.cursor is not None:
+        films, next_cursor = await fetch_page(
+            film_service.search_page(
+                query, pagination.cursor or None, pagination.page_size
+            )
+        )
+        if not films and not pagination.cursor:
+            raise HTTPException(
+                status_code=HTTPStatus.NOT_FOUND, detail="No films were found"
+            )
+        return page_response(films, next_cursor, Film)
+    films = await film_service.search.raw(
         query, pagination.page_number, pagination.page_size
     )
-    if not films:
+    if not films or films == b"[]":
         raise HTTPException(
             status_code=HTTPStatus.NOT_FOUND, detail="No films were found"
         )
-    return films
+    return RawJSONResponse(films)
 
 
 @router.get(
@@ -52,13 +80,13 @@ async def search_film(
 )
 async def get_film_details(
         film_id: str, film_service: FilmService = Depends(get_film_service)
-) -> FilmDetails:
-    film = await film_service.get_by_id(film_id)
+) -> RawJSONResponse:
+    film = await film_service.get_by_id.raw(film_id)
     if not film:
         raise HTTPException(
             status_code=HTTPStatus.NOT_FOUND, detail="Film was not found"
         )
-    return film
+    return RawJSONResponse(film)
 
 
 @router.get(
@@ -68,11 +96,20 @@ async def get_film_details(
 )
 async def get_films_alike(
         film_id: str, film_service: FilmService = Depends(get_film_service)
-) -> list[Film]:
-    film = await film_service.get_by_id(film_id)
-    films_alike = await film_service.get_by_genres(film.genres)
-    if not films_alike:
+) -> RawJSONResponse:
+    films_alike = await film_service.get_alike(film_id)
+    if films_alike is None:
+        # The job hasn't written this film's list yet.
+        film = await film_service.get_by_id(film_id)
+        if not film:
+            raise HTTPException(
+                status_code=HTTPStatus.NOT_FOUND, detail="Film was not found"
+            )
+        films_alike = dump_json(
+            await film_service.get_alike_by_genres(film), Film
+        )
+    if films_alike == b"[]":
         raise HTTPException(
             status_code=HTTPStatus.NOT_FOUND, detail="No films alike"
         )
-    return films_alike
+    return RawJSONResponse(films_alike)
@@ -4,6 +4,8 @@ from fastapi import APIRouter, Depends, HTTPException
 
 from fastapi_service.src.models.genre import Genre
 from fastapi_service.src.services.genre import GenreService, get_genre_service
+from fastapi_service.src.utils.response import RawJSONResponse
+from fastapi_service.src.utils.serialization import dump_json
 
 router = APIRouter(prefix="/api/v1/genres", tags=["GenreService"])
 
@@ -15,8 +17,9 @@ router = APIRouter(prefix="/api/v1/genres", tags=["GenreService"])
 )
 async def get_genres(
         genre_service: GenreService = Depends(get_genre_service),
-) -> list[Genre]:
-    return await genre_service.get_genres()
+) -> RawJSONResponse:
+    genres = await genre_service.get_genres()
+    return RawJSONResponse(dump_json(genres, Genre))
 
 
 @router.get(
@@ -27,10 +30,10 @@ async def get_genres(
 async def get_genre_details(
         genre_id: str,
         genre_service: GenreService = Depends(get_genre_service),
-) -> Genre:
+) -> RawJSONResponse:
     genre = await genre_service.get_by_id(genre_id)
     if not genre:
         raise HTTPException(
             status_code=HTTPStatus.NOT_FOUND, detail="Genre was not found"
         )
-    return genre
+    return RawJSONResponse(dump_json(genre, Genre))
@@ -8,7 +8,13 @@ from fastapi_service.src.services.person import (
     PersonService,
     get_person_service,
 )
-from fastapi_service.src.utils.pagination import Pagination
+from fastapi_service.src.utils.pagination import (
+    Pagination,
+    fetch_page,
+    page_response,
+)
+from fastapi_service.src.utils.response import RawJSONResponse
+from fastapi_service.src.utils.serialization import dump_json
 
 router = APIRouter(prefix="/api/v1/persons", tags=["PersonService"])
 
@@ -22,15 +28,27 @@ async def search_person(
         query: str,
         pagination: Pagination = Depends(),
         person_service: PersonService = Depends(get_person_service),
-) -> list[PersonWithFilms]:
-    persons = await person_service.search(
+) -> RawJSONResponse:
+    if pagination.cursor is not None:
+        persons, next_cursor = await fetch_page(
+            person_service.search_page(
+                query, pagination.cursor or None, pagination.page_size
+            )
+        )
+        if not persons and not pagination.cursor:
+            raise HTTPException(
+                status_code=HTTPStatus.NOT_FOUND,
+                detail="No people were found",
+            )
+        return page_response(persons, next_cursor, PersonWithFilms)
+    persons = await person_service.search.raw(
         query, pagination.page_number, pagination.page_size
     )
-    if not persons:
+    if not persons or persons == b"[]":
         raise HTTPException(
             status_code=HTTPStatus.NOT_FOUND, detail="No people were found"
         )
-    return persons
+    return RawJSONResponse(persons)
 
 
 @router.get(
@@ -41,13 +59,13 @@ async def search_person(
 async def get_person_details(
         person_id: str,
         person_service: PersonService = Depends(get_person_service),
-) -> PersonWithFilms:
-    person = await person_service.get_by_id(person_id)
+) -> RawJSONResponse:
+    person = await person_service.get_by_id.raw(person_id)
     if not person:
         raise HTTPException(
             status_code=HTTPStatus.NOT_FOUND, detail="Person was not found"
         )
-    return person
+    return RawJSONResponse(person)
 
 
 @router.get(
@@ -58,7 +76,7 @@ async def get_person_details(
 async def get_person_film_works(
         person_id: str,
         person_service: PersonService = Depends(get_person_service),
-) -> list[Film]:
+) -> RawJSONResponse:
     person_film_works = await person_service.get_film_works_by_person_id(
         person_id
     )
@@ -66,4 +84,4 @@ async def get_person_film_works(
         raise HTTPException(
             status_code=HTTPStatus.NOT_FOUND, detail="No film works were found"
         )
-    return person_film_works
+    return RawJSONResponse(dump_json(person_film_works, Film))
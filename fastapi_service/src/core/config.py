@@ -13,12 +13,107 @@ PROJECT_NAME = os.getenv("PROJECT_NAME", "movies")
 
 REDIS_HOST = os.getenv("REDIS_HOST", "127.0.0.1")
 REDIS_PORT = int(os.getenv("REDIS_PORT", 6379))
+# Connects over a unix socket instead of host and port when set
+REDIS_UNIX_SOCKET = os.getenv("REDIS_UNIX_SOCKET", "")
+# 3 switches the connections to RESP3
+REDIS_PROTOCOL = int(os.getenv("REDIS_PROTOCOL", 2))
+REDIS_MAX_CONNECTIONS = int(os.getenv("REDIS_MAX_CONNECTIONS", 50))
+# Seconds to wait for a free connection once all of them are in use
+REDIS_POOL_TIMEOUT = float(os.getenv("REDIS_POOL_TIMEOUT", 5))
+REDIS_CONNECT_TIMEOUT = float(os.getenv("REDIS_CONNECT_TIMEOUT", 2))
+REDIS_SOCKET_TIMEOUT = float(os.getenv("REDIS_SOCKET_TIMEOUT", 5))
+REDIS_RETRY_ON_TIMEOUT = (
+    os.getenv("REDIS_RETRY_ON_TIMEOUT", "true").lower() == "true"
+)
+REDIS_HEALTH_CHECK_INTERVAL = int(
+    os.getenv("REDIS_HEALTH_CHECK_INTERVAL", 30)
+)
+
+CACHE_TTL = int(os.getenv("CACHE_TTL", 1200))
+CACHE_INVALIDATION_CHANNEL = os.getenv(
+    "CACHE_INVALIDATION_CHANNEL", "cache:invalidate"
+)
+CACHE_CODEC = os.getenv("CACHE_CODEC", "orjson")
+CACHE_COMPRESSION = os.getenv("CACHE_COMPRESSION", "zlib")
+CACHE_COMPRESS_THRESHOLD = int(os.getenv("CACHE_COMPRESS_THRESHOLD", 4096))
+CACHE_STALE_TTL = int(os.getenv("CACHE_STALE_TTL", 600))
+CACHE_EARLY_REFRESH_BETA = float(os.getenv("CACHE_EARLY_REFRESH_BETA", 1.0))
+CACHE_TTL_JITTER = float(os.getenv("CACHE_TTL_JITTER", 0.1))
+CACHE_LOCK_TIMEOUT = float(os.getenv("CACHE_LOCK_TIMEOUT", 0))
+CACHE_LOCK_POLL_INTERVAL = float(os.getenv("CACHE_LOCK_POLL_INTERVAL", 0.05))
+
+LOCAL_CACHE_ENABLED = (
+    os.getenv("LOCAL_CACHE_ENABLED", "true").lower() == "true"
+)
+LOCAL_CACHE_TTL = int(os.getenv("LOCAL_CACHE_TTL", 30))
+LOCAL_CACHE_MAXSIZE = int(os.getenv("LOCAL_CACHE_MAXSIZE", 1024))
+LOCAL_CACHE_MAX_BYTES = int(
+    os.getenv("LOCAL_CACHE_MAX_BYTES", 32 * 1024 ** 2)
+)
 
 ELASTIC_SCHEME = os.getenv("ELASTIC_SCHEME", "http")
 ELASTIC_HOST = os.getenv("ELASTIC_HOST", "127.0.0.1")
 ELASTIC_PORT = int(os.getenv("ELASTIC_PORT", 9200))
+ELASTIC_CONNECTIONS_PER_NODE = int(
+    os.getenv("ELASTIC_CONNECTIONS_PER_NODE", 25)
+)
+ELASTIC_REQUEST_TIMEOUT = float(os.getenv("ELASTIC_REQUEST_TIMEOUT", 10))
+ELASTIC_MAX_RETRIES = int(os.getenv("ELASTIC_MAX_RETRIES", 3))
+ELASTIC_RETRY_ON_TIMEOUT = (
+    os.getenv("ELASTIC_RETRY_ON_TIMEOUT", "true").lower() == "true"
+)
+ELASTIC_HTTP_COMPRESS = (
+    os.getenv("ELASTIC_HTTP_COMPRESS", "false").lower() == "true"
+)
+# Discovers the other nodes of the cluster on startup and on node failures
+ELASTIC_SNIFF = os.getenv("ELASTIC_SNIFF", "false").lower() == "true"
 ELASTIC_FILM_INDEX = os.getenv("ES_FILM_INDEX", "movies")
 ELASTIC_GENRE_INDEX = os.getenv("ES_GENRE_INDEX", "genres")
 ELASTIC_PERSON_INDEX = os.getenv("ES_PERSON_INDEX", "persons")
+ELASTIC_PIT_KEEP_ALIVE = os.getenv("ELASTIC_PIT_KEEP_ALIVE", "1m")
+ELASTIC_TRUSTED_SOURCE = (
+    os.getenv("ELASTIC_TRUSTED_SOURCE", "true").lower() == "true"
+)
+ELASTIC_MSEARCH_BATCHING = (
+    os.getenv("ELASTIC_MSEARCH_BATCHING", "false").lower() == "true"
+)
+ELASTIC_MSEARCH_WINDOW_MS = float(os.getenv("ELASTIC_MSEARCH_WINDOW_MS", 2))
+ELASTIC_MSEARCH_MAX_SIZE = int(os.getenv("ELASTIC_MSEARCH_MAX_SIZE", 100))
+ELASTIC_MAX_RESULT_SIZE = int(os.getenv("ELASTIC_MAX_RESULT_SIZE", 10000))
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+GENRE_CATALOGUE_ENABLED = (
+    os.getenv("GENRE_CATALOGUE_ENABLED", "true").lower() == "true"
+)
+GENRE_CATALOGUE_REFRESH_INTERVAL = int(
+    os.getenv("GENRE_CATALOGUE_REFRESH_INTERVAL", 300)
+)
+GENRE_CATALOGUE_SIZE = int(os.getenv("GENRE_CATALOGUE_SIZE", 10000))
+
+SERVICE_CONCURRENCY_LIMIT = int(os.getenv("SERVICE_CONCURRENCY_LIMIT", 8))
+SERVICE_IO_TIMEOUT = float(os.getenv("SERVICE_IO_TIMEOUT", 10))
+
+FILMS_ALIKE_TOP_K = int(os.getenv("FILMS_ALIKE_TOP_K", 10))
+FILMS_ALIKE_BATCH_SIZE = int(os.getenv("FILMS_ALIKE_BATCH_SIZE", 1000))
+# The job also rebuilds every list from scratch at this interval, seconds
+FILMS_ALIKE_REBUILD_INTERVAL = int(
+    os.getenv("FILMS_ALIKE_REBUILD_INTERVAL", 86400)
+)
+# Films scored per genre, the best rated ones, bounding the job's work
+FILMS_ALIKE_CANDIDATES = int(os.getenv("FILMS_ALIKE_CANDIDATES", 200))
+# Lists not rewritten by a rebuild expire, e.g. of removed films, seconds
+FILMS_ALIKE_TTL = int(os.getenv("FILMS_ALIKE_TTL", 3 * 86400))
+
+PERSON_FILMS_BATCH_SIZE = int(os.getenv("PERSON_FILMS_BATCH_SIZE", 1000))
+PERSON_FILMS_REBUILD_INTERVAL = int(
+    os.getenv("PERSON_FILMS_REBUILD_INTERVAL", 86400)
+)
+
+# Serves Prometheus metrics on /metrics and times every request
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+
+# Traces requests into spans and returns their timings in Server-Timing
+TRACING_ENABLED = os.getenv("TRACING_ENABLED", "false").lower() == "true"
+# Appends the spans of every request to this file as JSON lines when set
+TRACING_EXPORT_PATH = os.getenv("TRACING_EXPORT_PATH", "")
@@ -0,0 +1,209 @@
+import inspect
+import time
+from contextvars import ContextVar
+from functools import wraps
+from typing import Callable, TypeVar
+
+from prometheus_client import Counter, Gauge, Histogram
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+from prometheus_client.registry import Collector
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from fastapi_service.src.db.local_cache import LocalCache
+
+T = TypeVar("T")
+
+LATENCY_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10
+)
+
+REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "Latency of HTTP requests by route.",
+    ["method", "route"],
+    buckets=LATENCY_BUCKETS,
+)
+REQUESTS = Counter(
+    "http_requests_total",
+    "HTTP requests by route and status code.",
+    ["method", "route", "status"],
+)
+REQUESTS_IN_PROGRESS = Gauge(
+    "http_requests_in_progress", "HTTP requests being served."
+)
+CACHE_REQUESTS = Counter(
+    "cache_requests_total",
+    "Cache lookups by key prefix and result: local_hit, hit or miss.",
+    ["prefix", "result"],
+)
+CACHE_SETS = Counter(
+    "cache_sets_total", "Entries written to Redis by key prefix.", ["prefix"]
+)
+ELASTIC_REQUEST_DURATION = Histogram(
+    "elasticsearch_request_duration_seconds",
+    "Latency of Elasticsearch calls by repository method and index.",
+    ["method", "index"],
+    buckets=LATENCY_BUCKETS,
+)
+ELASTIC_REQUESTS = Counter(
+    "elasticsearch_requests_total",
+    "Elasticsearch calls by the service method making them, repository "
+    "method and index.",
+    ["caller", "method", "index"],
+)
+
+_elastic_caller: ContextVar[str] = ContextVar(
+    "elastic_caller", default="none"
+)
+
+
+class CacheMetrics:
+    """The cache counters of one key prefix, bound once per decorator."""
+
+    def __init__(self, prefix: str):
+        self.local_hits = CACHE_REQUESTS.labels(prefix, "local_hit")
+        self.hits = CACHE_REQUESTS.labels(prefix, "hit")
+        self.misses = CACHE_REQUESTS.labels(prefix, "miss")
+        self.sets = CACHE_SETS.labels(prefix)
+
+
+def elastic_caller(name: str) -> Callable[[T], T]:
+    """Counts the Elasticsearch calls of an async function under ``name``.
+
+    The innermost caller wins, so a service method calling another one
+    doesn't get its calls.
+    """
+
+    def decorator(func):
+        @wraps(func)
+        async def wrapper(*args, **kwargs):
+            token = _elastic_caller.set(name)
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                _elastic_caller.reset(token)
+
+        return wrapper
+
+    return decorator
+
+
+def elastic_callers(cls: type[T]) -> type[T]:
+    """Counts the calls of the public coroutine methods as ``Class.name``.
+
+    Cached methods are counted by the cache decorators, under the name of
+    the method they wrap. Apply it above ``traced_methods``, which leaves
+    wrapped methods alone.
+    """
+    for attr, value in list(vars(cls).items()):
+        if not attr.startswith("_") and inspect.iscoroutinefunction(value):
+            setattr(
+                cls, attr, elastic_caller(f"{cls.__name__}.{attr}")(value)
+            )
+    return cls
+
+
+def timed_elastic_call(method: Callable) -> Callable:
+    """Records the latency and caller of a repository method call."""
+    name = method.__name__
+
+    @wraps(method)
+    async def wrapper(self, *args, **kwargs):
+        ELASTIC_REQUESTS.labels(_elastic_caller.get(), name, self.index).inc()
+        started = time.perf_counter()
+        try:
+            return await method(self, *args, **kwargs)
+        finally:
+            ELASTIC_REQUEST_DURATION.labels(name, self.index).observe(
+                time.perf_counter() - started
+            )
+
+    return wrapper
+
+
+class PoolStatsCollector(Collector):
+    """Exposes connection pool stats, read on every scrape.
+
+    ``pools`` maps a pool name to a function returning its stats, such as
+    ``redis_pool_stats``. Every stat becomes a ``<pool>_pool_<stat>`` gauge.
+    """
+
+    def __init__(self, pools: dict[str, Callable[[], dict[str, int]]]):
+        self.pools = pools
+
+    def collect(self):
+        for pool, stats in self.pools.items():
+            for stat, value in stats().items():
+                yield GaugeMetricFamily(
+                    f"{pool}_pool_{stat}",
+                    f"{stat.replace('_', ' ').capitalize()} of {pool}.",
+                    value=value,
+                )
+
+
+class LocalCacheCollector(Collector):
+    """Exposes the size and evictions of the local caches by name."""
+
+    def __init__(self, caches: dict[str, LocalCache]):
+        self.caches = caches
+
+    def collect(self):
+        entries = GaugeMetricFamily(
+            "local_cache_entries",
+            "Entries of a local cache.",
+            labels=["cache"],
+        )
+        size = GaugeMetricFamily(
+            "local_cache_size_bytes",
+            "Bytes charged to a local cache.",
+            labels=["cache"],
+        )
+        evictions = CounterMetricFamily(
+            "local_cache_evictions",
+            "Entries evicted from a local cache to stay within its limits.",
+            labels=["cache"],
+        )
+        for name, cache in list(self.caches.items()):
+            stats = cache.stats()
+            entries.add_metric([name], stats["entries"])
+            size.add_metric([name], stats["size_bytes"])
+            evictions.add_metric([name], stats["evictions"])
+        yield entries
+        yield size
+        yield evictions
+
+
+class MetricsMiddleware:
+    """Records the latency, status and concurrency of HTTP requests.
+
+    Requests are labelled with their route template, e.g.
+    ``/api/v1/films/{film_id}``, so the label set stays bounded.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        REQUESTS_IN_PROGRESS.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            REQUESTS_IN_PROGRESS.dec()
+            route = scope.get("route")
+            path = route.path if route else "unmatched"
+            REQUEST_DURATION.labels(scope["method"], path).observe(elapsed)
+            REQUESTS.labels(scope["method"], path, status).inc()
@@ -0,0 +1,210 @@
+import asyncio
+import inspect
+import json
+import os
+import re
+import threading
+import time
+from collections import defaultdict
+from contextvars import ContextVar
+from functools import wraps
+from typing import Callable, TypeVar
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from fastapi_service.src.core import config
+from fastapi_service.src.core.logger import logger
+
+T = TypeVar("T")
+
+_TRACEPARENT = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-[0-9a-f]{2}$")
+
+
+class Trace:
+    """The spans of one request, kept until the response is sent."""
+
+    __slots__ = ("trace_id", "spans", "closed")
+
+    def __init__(self, trace_id: str | None = None):
+        self.trace_id = trace_id or os.urandom(16).hex()
+        self.spans: list["Span"] = []
+        self.closed = False
+
+
+class Span:
+    """A timed operation, with the fields of an OpenTelemetry span."""
+
+    __slots__ = ("trace", "span_id", "parent_id", "name", "start", "end")
+
+    def __init__(self, trace: Trace, name: str, parent_id: str | None):
+        self.trace = trace
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.name = name
+        self.start = time.time_ns()
+        self.end = None
+
+    @property
+    def duration_ms(self) -> float:
+        return (self.end - self.start) / 1e6
+
+    def finish(self) -> None:
+        self.end = time.time_ns()
+        if not self.trace.closed:
+            self.trace.spans.append(self)
+
+    def to_dict(self) -> dict:
+        return {
+            "traceId": self.trace.trace_id,
+            "spanId": self.span_id,
+            "parentSpanId": self.parent_id or "",
+            "name": self.name,
+            "startTimeUnixNano": self.start,
+            "endTimeUnixNano": self.end,
+        }
+
+
+_current_span: ContextVar[Span | None] = ContextVar(
+    "current_span", default=None
+)
+
+
+def traced(name: str) -> Callable[[T], T]:
+    """Records every call of an async function as a span named ``name``.
+
+    Calls made outside a traced request record nothing. With tracing
+    disabled the function is returned as is, so it costs nothing.
+    """
+
+    def decorator(func):
+        if not config.TRACING_ENABLED:
+            return func
+
+        @wraps(func)
+        async def wrapper(*args, **kwargs):
+            parent = _current_span.get()
+            if parent is None:
+                return await func(*args, **kwargs)
+            span = Span(parent.trace, name, parent.span_id)
+            token = _current_span.set(span)
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                _current_span.reset(token)
+                span.finish()
+
+        return wrapper
+
+    return decorator
+
+
+def traced_methods(cls: type[T]) -> type[T]:
+    """Traces the public coroutine methods of a service as ``Class.name``.
+
+    Methods that are already decorated are left alone: the cache
+    decorators trace the methods they wrap themselves.
+    """
+    if not config.TRACING_ENABLED:
+        return cls
+    for attr, value in list(vars(cls).items()):
+        if (
+                not attr.startswith("_")
+                and inspect.iscoroutinefunction(value)
+                and not hasattr(value, "__wrapped__")
+        ):
+            setattr(cls, attr, traced(f"{cls.__name__}.{attr}")(value))
+    return cls
+
+
+def server_timing(spans: list[Span], total_ms: float) -> str:
+    """Sums the spans by name into a ``Server-Timing`` header value."""
+    durations = defaultdict(float)
+    counts = defaultdict(int)
+    for span in spans:
+        durations[span.name] += span.duration_ms
+        counts[span.name] += 1
+    metrics = [
+        f'{name};dur={duration:.1f};desc="{counts[name]}x"'
+        for name, duration in durations.items()
+    ]
+    metrics.append(f"total;dur={total_ms:.1f}")
+    return ", ".join(metrics)
+
+
+class SpanExporter:
+    """Appends finished traces to a file, one JSON span per line.
+
+    The lines follow the OpenTelemetry span field names, so a collector
+    tailing the file can forward them.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    async def export(self, spans: list[Span]) -> None:
+        lines = [json.dumps(span.to_dict()) + "\n" for span in spans]
+        await asyncio.to_thread(self._write, lines)
+
+    def _write(self, lines: list[str]) -> None:
+        try:
+            with self._lock, open(self.path, "a") as file:
+                file.writelines(lines)
+        except OSError:
+            logger.exception("Failed to export spans to '%s'", self.path)
+
+
+class TracingMiddleware:
+    """Traces every HTTP request and returns its timings.
+
+    A request continues the trace of its ``traceparent`` header, if any.
+    The response carries the spans finished by the time it starts in a
+    ``Server-Timing`` header, and the whole trace goes to ``exporter``.
+    """
+
+    def __init__(self, app: ASGIApp, exporter: SpanExporter | None = None):
+        self.app = app
+        self.exporter = exporter
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        trace_id, parent_id = _parse_traceparent(scope)
+        trace = Trace(trace_id)
+        root = Span(trace, f"{scope['method']} {scope['path']}", parent_id)
+
+        async def send_with_timing(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                headers.append(
+                    "Server-Timing",
+                    server_timing(
+                        trace.spans, (time.time_ns() - root.start) / 1e6
+                    ),
+                )
+            await send(message)
+
+        token = _current_span.set(root)
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current_span.reset(token)
+            route = scope.get("route")
+            if route:
+                root.name = f"{scope['method']} {route.path}"
+            root.finish()
+            trace.closed = True
+        if self.exporter:
+            await self.exporter.export(trace.spans)
+
+
+def _parse_traceparent(scope: Scope) -> tuple[str | None, str | None]:
+    for key, value in scope["headers"]:
+        if key == b"traceparent":
+            match = _TRACEPARENT.match(value.decode("latin-1"))
+            if match:
+                return match.group(1), match.group(2)
+    return None, None
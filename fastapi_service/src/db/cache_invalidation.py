@@ -0,0 +1,120 @@
+import asyncio
+import contextlib
+import json
+from typing import Awaitable, Callable, Iterable
+
+from redis.asyncio import Redis
+
+from fastapi_service.src.core import config
+from fastapi_service.src.core.logger import logger
+from fastapi_service.src.db.local_cache import local_caches
+
+
+def tag_key(tag: str) -> str:
+    """Redis sorted set of the cache entries that depend on ``tag``.
+
+    Tags name the entities an entry was built from, e.g. ``film:<id>``.
+    Members are the keys of the entries, scored by their expiry in ms.
+    """
+    return f"tag:{tag}"
+
+
+async def invalidate(redis: Redis, tags: Iterable[str]) -> None:
+    """Asks every API worker to purge the entries that depend on ``tags``."""
+    await redis.publish(
+        config.CACHE_INVALIDATION_CHANNEL, json.dumps(list(tags))
+    )
+
+
+async def purge(redis: Redis, tags: Iterable[str]) -> int:
+    """Drops the entries that depend on ``tags`` from Redis and this process.
+
+    An entry cached under a tag itself, such as ``film:<id>``, is dropped
+    too. The tag sets are left to expire, so every worker that receives the
+    same invalidation still finds the keys to drop from its local caches.
+    """
+    tags = list(tags)
+    if not tags:
+        return 0
+    async with redis.pipeline(transaction=False) as pipe:
+        for tag in tags:
+            pipe.zrange(tag_key(tag), 0, -1)
+        members = await pipe.execute()
+    keys = set(tags)
+    for tag_members in members:
+        keys.update(key.decode("utf-8") for key in tag_members)
+    for key in keys:
+        local_cache = local_caches.get(key.split(":", 1)[0])
+        if local_cache:
+            local_cache.delete(key)
+    return await redis.delete(*keys)
+
+
+def _parse_tags(data: bytes) -> list[str]:
+    message = data.decode("utf-8")
+    try:
+        tags = json.loads(message)
+    except json.JSONDecodeError:
+        return [message]
+    return [tags] if isinstance(tags, str) else list(tags)
+
+
+class InvalidationListener:
+    """Purges cache entries on messages from the invalidation channel.
+
+    A message is either a single tag, e.g. ``person:<id>``, or a JSON list
+    of tags. A ``handler`` replaces the purge for consumers that react to
+    the same events in another way, and ``on_purge`` is awaited with the
+    tags after every purge, for in-process copies kept outside the caches.
+    """
+
+    def __init__(
+            self,
+            redis: Redis,
+            channel: str,
+            handler: Callable[[list[str]], Awaitable[None]] | None = None,
+            on_purge: Callable[[list[str]], Awaitable[None]] | None = None,
+    ):
+        self.redis = redis
+        self.channel = channel
+        self.handler = handler
+        self.on_purge = on_purge
+        self._task: asyncio.Task | None = None
+
+    async def start(self) -> None:
+        self._task = asyncio.create_task(self._listen_forever())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+    async def _listen_forever(self) -> None:
+        while True:
+            try:
+                await self._listen()
+            except asyncio.CancelledError:
+                raise
+            except Exception:  # noqa
+                logger.exception("Cache invalidation listener failed")
+                await asyncio.sleep(1)
+
+    async def _listen(self) -> None:
+        pubsub = self.redis.pubsub()
+        try:
+            await pubsub.subscribe(self.channel)
+            async for message in pubsub.listen():
+                if message["type"] != "message":
+                    continue
+                tags = _parse_tags(message["data"])
+                if self.handler:
+                    await self.handler(tags)
+                    continue
+                purged = await purge(self.redis, tags)
+                logger.info("Purged %d cache entries for %s", purged, tags)
+                if self.on_purge:
+                    await self.on_purge(tags)
+        finally:
+            await pubsub.aclose()
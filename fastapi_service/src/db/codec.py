@@ -0,0 +1,209 @@
+import json
+import struct
+import zlib
+from abc import ABC, abstractmethod
+from typing import Any, NamedTuple
+
+from fastapi_service.src.core import config
+from fastapi_service.src.core.logger import logger
+from fastapi_service.src.utils.encoder import UUIDEncoder
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import lz4.frame as lz4
+except ImportError:
+    lz4 = None
+
+# Every cached value starts with the moment it expires, the time it took to
+# compute, needed to refresh it ahead of or after expiry, and a byte with the
+# ids of the codec (high nibble) and compression (low nibble) of the payload.
+ENTRY_HEADER = struct.Struct("!ddB")
+
+
+class Codec(ABC):
+    id: int
+    name: str
+    is_json: bool = False
+
+    @abstractmethod
+    def dumps(self, data: Any) -> bytes:
+        pass
+
+    @abstractmethod
+    def loads(self, payload: bytes) -> Any:
+        pass
+
+
+class JsonCodec(Codec):
+    id = 1
+    name = "json"
+    is_json = True
+
+    def dumps(self, data: Any) -> bytes:
+        return json.dumps(
+            data, cls=UUIDEncoder, separators=(",", ":")
+        ).encode("utf-8")
+
+    def loads(self, payload: bytes) -> Any:
+        return json.loads(payload)
+
+
+class OrjsonCodec(Codec):
+    id = 2
+    name = "orjson"
+    is_json = True
+
+    def dumps(self, data: Any) -> bytes:
+        return orjson.dumps(data)
+
+    def loads(self, payload: bytes) -> Any:
+        return orjson.loads(payload)
+
+
+class MsgpackCodec(Codec):
+    id = 3
+    name = "msgpack"
+
+    def dumps(self, data: Any) -> bytes:
+        return msgpack.packb(data, default=str)
+
+    def loads(self, payload: bytes) -> Any:
+        return msgpack.unpackb(payload)
+
+
+class Compressor(ABC):
+    id: int
+    name: str
+
+    @abstractmethod
+    def compress(self, payload: bytes) -> bytes:
+        pass
+
+    @abstractmethod
+    def decompress(self, payload: bytes) -> bytes:
+        pass
+
+
+class ZlibCompressor(Compressor):
+    id = 1
+    name = "zlib"
+
+    def compress(self, payload: bytes) -> bytes:
+        return zlib.compress(payload, level=1)
+
+    def decompress(self, payload: bytes) -> bytes:
+        return zlib.decompress(payload)
+
+
+class Lz4Compressor(Compressor):
+    id = 2
+    name = "lz4"
+
+    def compress(self, payload: bytes) -> bytes:
+        return lz4.compress(payload)
+
+    def decompress(self, payload: bytes) -> bytes:
+        return lz4.decompress(payload)
+
+
+CODECS = {
+    "json": (JsonCodec, True),
+    "orjson": (OrjsonCodec, orjson is not None),
+    "msgpack": (MsgpackCodec, msgpack is not None),
+}
+COMPRESSORS = {
+    "zlib": (ZlibCompressor, True),
+    "lz4": (Lz4Compressor, lz4 is not None),
+}
+
+
+def _pick(options: dict, name: str, fallback: str | None):
+    if name not in options:
+        raise ValueError(f"Unknown cache codec or compression '{name}'")
+    cls, available = options[name]
+    if available:
+        return cls()
+    logger.warning(
+        "'%s' is not installed, falling back to '%s'", name, fallback
+    )
+    return _pick(options, fallback, None) if fallback else None
+
+
+class CacheEntry(NamedTuple):
+    expires_at: float
+    delta: float
+    payload: bytes
+
+
+class EntryCodec:
+    """Packs cached values into Redis entries and back.
+
+    Payloads larger than ``compress_threshold`` bytes are compressed. An
+    entry written with another codec or compression fails to unpack with
+    ``ValueError``, so it is recomputed instead of being misread.
+    """
+
+    def __init__(
+            self,
+            codec: Codec,
+            compressor: Compressor | None = None,
+            compress_threshold: int = 0,
+    ):
+        self.codec = codec
+        self.compressor = compressor
+        self.compress_threshold = compress_threshold
+
+    def pack(self, payload: bytes, expires_at: float, delta: float) -> bytes:
+        """Packs a payload already encoded with ``codec``."""
+        compression = 0
+        if self.compressor and len(payload) > self.compress_threshold:
+            payload = self.compressor.compress(payload)
+            compression = self.compressor.id
+        flags = self.codec.id << 4 | compression
+        return ENTRY_HEADER.pack(expires_at, delta, flags) + payload
+
+    def unpack(self, entry: bytes) -> CacheEntry:
+        try:
+            expires_at, delta, flags = ENTRY_HEADER.unpack_from(entry)
+        except struct.error as exc:
+            raise ValueError("Cache entry is too short") from exc
+        codec_id, compression = flags >> 4, flags & 0x0F
+        if codec_id != self.codec.id:
+            raise ValueError(f"Cache entry has unknown codec {codec_id}")
+        payload = entry[ENTRY_HEADER.size:]
+        if compression:
+            if not self.compressor or compression != self.compressor.id:
+                raise ValueError(
+                    f"Cache entry has unknown compression {compression}"
+                )
+            payload = self.compressor.decompress(payload)
+        return CacheEntry(expires_at, delta, payload)
+
+    def to_json(self, payload: bytes) -> bytes:
+        if self.codec.is_json:
+            return payload
+        data = self.codec.loads(payload)
+        if orjson:
+            return orjson.dumps(data)
+        return JsonCodec().dumps(data)
+
+
+def get_entry_codec() -> EntryCodec:
+    return EntryCodec(
+        _pick(CODECS, config.CACHE_CODEC, "json"),
+        (
+            _pick(COMPRESSORS, config.CACHE_COMPRESSION, "zlib")
+            if config.CACHE_COMPRESSION != "none"
+            else None
+        ),
+        config.CACHE_COMPRESS_THRESHOLD,
+    )
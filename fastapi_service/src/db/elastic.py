@@ -1,29 +1,177 @@
-from elasticsearch import AsyncElasticsearch, NotFoundError
+from elasticsearch import (
+    AsyncElasticsearch,
+    BadRequestError,
+    NotFoundError,
+)
 
+from fastapi_service.src.core import config
 from fastapi_service.src.core.logger import logger
+from fastapi_service.src.core.metrics import timed_elastic_call
+from fastapi_service.src.core.tracing import traced
+from fastapi_service.src.db.msearch import MsearchBatcher
 from fastapi_service.src.db.search_repository import SearchRepository
+from fastapi_service.src.utils.pagination import (
+    CursorError,
+    decode_cursor,
+    encode_cursor,
+)
 
-es: AsyncElasticsearch | None = None
+# The parts of a search response the services read, so Elasticsearch does
+# not serialize shard stats, totals and scores for every call.
+SEARCH_FILTER_PATH = [
+    "hits.hits._id",
+    "hits.hits._source",
+    "hits.hits.sort",
+    "pit_id",
+]
+MGET_FILTER_PATH = ["docs._id", "docs.found", "docs._source"]
 
 
-async def get_elastic() -> AsyncElasticsearch:
-    return es
+def create_elastic() -> AsyncElasticsearch:
+    return AsyncElasticsearch(
+        hosts=[
+            f"{config.ELASTIC_SCHEME}://{config.ELASTIC_HOST}:"
+            f"{config.ELASTIC_PORT}"
+        ],
+        connections_per_node=config.ELASTIC_CONNECTIONS_PER_NODE,
+        request_timeout=config.ELASTIC_REQUEST_TIMEOUT,
+        max_retries=config.ELASTIC_MAX_RETRIES,
+        retry_on_timeout=config.ELASTIC_RETRY_ON_TIMEOUT,
+        http_compress=config.ELASTIC_HTTP_COMPRESS,
+        sniff_on_start=config.ELASTIC_SNIFF,
+        sniff_on_node_failure=config.ELASTIC_SNIFF,
+    )
+
+
+def elastic_pool_stats(elastic: AsyncElasticsearch) -> dict[str, int]:
+    """Nodes and connections of the client's pool across all nodes."""
+    nodes = elastic.transport.node_pool.all()
+    in_use = 0
+    for node in nodes:
+        # aiohttp exposes no public counter of the connections it lends.
+        connector = getattr(getattr(node, "session", None), "connector", None)
+        in_use += len(getattr(connector, "_acquired", ()))
+    return {
+        "nodes": len(nodes),
+        "max_connections": len(nodes) * config.ELASTIC_CONNECTIONS_PER_NODE,
+        "in_use_connections": in_use,
+    }
 
 
 class ElasticsearchRepository(SearchRepository):
-    def __init__(self, elastic: AsyncElasticsearch, index: str):
+    """Searches and fetches the documents of one index.
+
+    With a ``batcher``, searches go out merged with the concurrent ones of
+    the worker in a single _msearch. Point in time searches never do.
+    """
+
+    def __init__(
+            self,
+            elastic: AsyncElasticsearch,
+            index: str,
+            batcher: MsearchBatcher | None = None,
+    ):
         self.elastic = elastic
         self.index = index
+        self.batcher = batcher
+
+    @traced("es.search")
+    @timed_elastic_call
+    async def search(self, body: dict | bytes) -> list[dict]:
+        if self.batcher:
+            return _hits(await self.batcher.search(self.index, body))
+        response = await self.elastic.search(
+            index=self.index, body=body, filter_path=SEARCH_FILTER_PATH
+        )
+        return _hits(response.body)
+
+    @traced("es.search_after")
+    @timed_elastic_call
+    async def search_after(
+            self, body: dict, cursor: str | None
+    ) -> tuple[list[dict], str | None]:
+        """Pages through a point in time of the index with search_after.
+
+        The query's sort gets a ``_shard_doc`` tiebreaker, so every page
+        costs the same however deep it is.
+        """
+        keep_alive = config.ELASTIC_PIT_KEEP_ALIVE
+        if cursor:
+            pit_id, after = decode_cursor(cursor)
+        else:
+            response = await self.elastic.open_point_in_time(
+                index=self.index, keep_alive=keep_alive
+            )
+            pit_id, after = response["id"], None
 
-    async def search(self, body: dict) -> list[dict]:
-        response = await self.elastic.search(index=self.index, body=body)
-        return response["hits"]["hits"]
+        body = {
+            **body,
+            "sort": [*body.get("sort", []), {"_shard_doc": "asc"}],
+            "pit": {"id": pit_id, "keep_alive": keep_alive},
+        }
+        if after:
+            body["search_after"] = after
+        try:
+            response = await self.elastic.search(
+                body=body, filter_path=SEARCH_FILTER_PATH
+            )
+        except NotFoundError as exc:
+            raise CursorError("Cursor has expired") from exc
+        except BadRequestError as exc:
+            # Only a tampered cursor makes a later page a bad request.
+            if not cursor:
+                raise
+            raise CursorError("Invalid cursor") from exc
 
-    async def get(self, doc_id: str) -> dict:
+        hits = _hits(response.body)
+        pit_id = response.body.get("pit_id", pit_id)
+        if len(hits) < body.get("size", 10):
+            await self.elastic.close_point_in_time(id=pit_id)
+            return hits, None
+        return hits, encode_cursor(pit_id, hits[-1]["sort"])
+
+    @traced("es.get")
+    @timed_elastic_call
+    async def get(
+            self, doc_id: str, source: list[str] | None = None
+    ) -> dict:
         try:
-            response = await self.elastic.get(index=self.index, id=doc_id)
+            response = await self.elastic.get(
+                index=self.index, id=doc_id, source_includes=source
+            )
             return response["_source"]
         except NotFoundError:
             logger.exception(
                 "Error occurred while fetching a document '%s'", doc_id
             )
+
+    @traced("es.get_many")
+    @timed_elastic_call
+    async def get_many(
+            self, doc_ids: list[str], source: list[str] | None = None
+    ) -> list[dict | None]:
+        if not doc_ids:
+            return []
+        response = await self.elastic.mget(
+            index=self.index,
+            ids=doc_ids,
+            source_includes=source,
+            filter_path=MGET_FILTER_PATH,
+        )
+        docs = [
+            doc["_source"] if doc.get("found") else None
+            for doc in response["docs"]
+        ]
+        missing = [
+            doc_id for doc_id, doc in zip(doc_ids, docs) if doc is None
+        ]
+        if missing:
+            logger.warning(
+                "Documents %s weren't found in '%s'", missing, self.index
+            )
+        return docs
+
+
+def _hits(response: dict) -> list[dict]:
+    # filter_path drops "hits" altogether when nothing matched.
+    return response.get("hits", {}).get("hits", [])
@@ -0,0 +1,74 @@
+import time
+from collections import OrderedDict
+from typing import Any
+
+local_caches: dict[str, "LocalCache"] = {}
+
+
+class LocalCache:
+    """Per-process LRU cache with a TTL and a memory cap.
+
+    Values are stored as is and shared between callers, so they must not be
+    mutated. The size of an entry is supplied by the caller, usually as the
+    length of its serialized form.
+    """
+
+    def __init__(self, name: str, maxsize: int, ttl: float, max_bytes: int):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.size_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: OrderedDict[str, tuple[Any, int, float]] = (
+            OrderedDict()
+        )
+        local_caches[name] = self
+
+    def get(self, key: str) -> Any | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        value, _, expires_at = entry
+        if expires_at <= time.monotonic():
+            self.delete(key)
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: str, value: Any, size: int) -> None:
+        if size > self.max_bytes:
+            return
+        self.delete(key)
+        self._entries[key] = (value, size, time.monotonic() + self.ttl)
+        self.size_bytes += size
+        while (
+                len(self._entries) > self.maxsize
+                or self.size_bytes > self.max_bytes
+        ):
+            _, (_, evicted_size, _) = self._entries.popitem(last=False)
+            self.size_bytes -= evicted_size
+            self.evictions += 1
+
+    def delete(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.size_bytes -= entry[1]
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.size_bytes = 0
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "entries": len(self._entries),
+            "size_bytes": self.size_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
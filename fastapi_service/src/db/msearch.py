@@ -0,0 +1,114 @@
+import asyncio
+
+from elastic_transport import ApiResponseMeta
+from elasticsearch import AsyncElasticsearch, ApiError
+from elasticsearch.exceptions import HTTP_EXCEPTIONS
+
+
+class _Search:
+    __slots__ = ("index", "body", "future")
+
+    def __init__(
+            self, index: str, body: dict | bytes, future: asyncio.Future
+    ):
+        self.index = index
+        self.body = body
+        self.future = future
+
+
+class MsearchBatcher:
+    """Merges searches issued within ``window`` seconds into one _msearch.
+
+    The first search of a batch schedules the flush, so a lone search waits
+    at most ``window``. A batch that reaches ``max_size`` is sent at once.
+    Every caller gets its own response, or the error of its own search.
+    """
+
+    def __init__(
+            self,
+            elastic: AsyncElasticsearch,
+            window: float,
+            max_size: int,
+            filter_path: list[str] | None = None,
+    ):
+        self.elastic = elastic
+        self.window = window
+        self.max_size = max_size
+        self.filter_path = filter_path
+        self._pending: list[_Search] = []
+        self._flush_handle: asyncio.TimerHandle | None = None
+        self._requests: set[asyncio.Task] = set()
+
+    async def search(self, index: str, body: dict | bytes) -> dict:
+        loop = asyncio.get_running_loop()
+        search = _Search(index, body, loop.create_future())
+        self._pending.append(search)
+        if len(self._pending) >= self.max_size:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.window, self._flush)
+        return await search.future
+
+    async def close(self) -> None:
+        self._flush()
+        if self._requests:
+            await asyncio.wait(self._requests)
+
+    def _flush(self) -> None:
+        if self._flush_handle:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch, self._pending = self._pending, []
+        batch = [search for search in batch if not search.future.done()]
+        if batch:
+            request = asyncio.create_task(self._send(batch))
+            self._requests.add(request)
+            request.add_done_callback(self._requests.discard)
+
+    async def _send(self, batch: list[_Search]) -> None:
+        searches = []
+        for search in batch:
+            searches += [{"index": search.index}, search.body]
+        try:
+            response = await self.elastic.msearch(
+                searches=searches,
+                filter_path=self._response_filter_path(),
+            )
+        except Exception as exc:  # noqa
+            for search in batch:
+                if not search.future.done():
+                    search.future.set_exception(exc)
+            return
+        for search, item in zip(batch, response["responses"]):
+            if search.future.done():
+                continue
+            if "error" in item:
+                search.future.set_exception(_item_error(item, response.meta))
+            else:
+                search.future.set_result(item)
+
+    def _response_filter_path(self) -> list[str] | None:
+        # Every item keeps its status, so an item left empty by the filter
+        # still takes its place in the responses array.
+        if self.filter_path is None:
+            return None
+        return [
+            "responses.status",
+            "responses.error",
+            *(f"responses.{path}" for path in self.filter_path),
+        ]
+
+
+def _item_error(item: dict, meta: ApiResponseMeta) -> ApiError:
+    status = item.get("status", 500)
+    error_cls = HTTP_EXCEPTIONS.get(status, ApiError)
+    error = item["error"]
+    message = error.get("type", "") if isinstance(error, dict) else error
+    meta = ApiResponseMeta(
+        status=status,
+        http_version=meta.http_version,
+        headers=meta.headers,
+        duration=meta.duration,
+        node=meta.node,
+    )
+    return error_cls(message=message, meta=meta, body=item)
@@ -0,0 +1,66 @@
+import json
+import re
+from json.encoder import encode_basestring_ascii
+from typing import Any
+
+_SLOT = re.compile(rb'"\{\{(\w+)\}\}"')
+
+
+class Param:
+    """A slot of a ``QueryTemplate`` body, filled by ``render``."""
+
+    __slots__ = ("name",)
+
+    def __init__(self, name: str):
+        self.name = name
+
+
+def _slot(value: Any) -> str:
+    if isinstance(value, Param):
+        return f"{{{{{value.name}}}}}"
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+# json.dumps builds a new encoder for every call with non-default options.
+_encode = json.JSONEncoder(separators=(",", ":")).encode
+
+
+def dumps(value: Any) -> bytes:
+    """Encodes a slot value, so it can also be encoded once and reused."""
+    if type(value) is bytes:
+        return value
+    if type(value) is str:
+        return encode_basestring_ascii(value).encode()
+    if type(value) is int:
+        return str(value).encode()
+    return _encode(value).encode()
+
+
+class QueryTemplate:
+    """A search body serialized to JSON once, when it is defined.
+
+    The ``Param`` values of ``body`` are slots: ``render`` serializes only
+    its keyword arguments and joins them with the prebuilt parts, so a
+    request sends ready bytes instead of a freshly built dict. Each value
+    is JSON encoded into its slot and can never change the query around it,
+    except ``bytes``, which are taken as encoded JSON, e.g. another render.
+    Scalars encode fastest, so hot templates keep their slots scalar.
+    """
+
+    def __init__(self, body: dict):
+        template = json.dumps(body, separators=(",", ":"), default=_slot)
+        parts = _SLOT.split(template.encode())
+        self._chunks = parts[0::2]
+        self._slots = [name.decode() for name in parts[1::2]]
+        self.params = frozenset(self._slots)
+
+    def render(self, **params: Any) -> bytes:
+        missing = self.params - params.keys()
+        if missing:
+            raise TypeError(f"Missing query parameters: {sorted(missing)}")
+        values = {name: dumps(params[name]) for name in self.params}
+        body = [self._chunks[0]]
+        for name, chunk in zip(self._slots, self._chunks[1:]):
+            body += [values[name], chunk]
+        return b"".join(body)
+
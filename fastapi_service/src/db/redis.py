@@ -1,51 +1,594 @@
+import asyncio
+import hashlib
+import inspect
 import json
-from functools import wraps
-from typing import Callable, Any
+import math
+import random
+import time
+from functools import update_wrapper, wraps
+from typing import Callable, Any, Iterable
+from uuid import UUID
 
-from redis.asyncio import Redis
+from pydantic import ValidationError
+from redis.asyncio import BlockingConnectionPool, Redis
+from redis.asyncio.connection import UnixDomainSocketConnection
+from redis.exceptions import LockError
 
-from fastapi_service.src.utils.encoder import UUIDEncoder
+from fastapi_service.src.core import config
+from fastapi_service.src.core.logger import logger
+from fastapi_service.src.core.metrics import CacheMetrics, elastic_caller
+from fastapi_service.src.core.tracing import traced
+from fastapi_service.src.db.cache_invalidation import tag_key
+from fastapi_service.src.db.codec import CacheEntry, get_entry_codec
+from fastapi_service.src.db.local_cache import LocalCache, local_caches
+from fastapi_service.src.utils.serialization import dump_json, list_adapter
+from fastapi_service.src.utils.single_flight import SingleFlight
 
-redis: Redis | None = None
+entry_codec = get_entry_codec()
 
 
-async def get_redis() -> Redis:
-    return redis
+def create_redis() -> Redis:
+    """A client whose pool waits for a free connection instead of failing.
 
+    Callers wait up to ``REDIS_POOL_TIMEOUT`` seconds once all
+    ``REDIS_MAX_CONNECTIONS`` connections are in use.
+    """
+    if config.REDIS_UNIX_SOCKET:
+        address = {
+            "connection_class": UnixDomainSocketConnection,
+            "path": config.REDIS_UNIX_SOCKET,
+        }
+    else:
+        address = {"host": config.REDIS_HOST, "port": config.REDIS_PORT}
+    pool = BlockingConnectionPool(
+        max_connections=config.REDIS_MAX_CONNECTIONS,
+        timeout=config.REDIS_POOL_TIMEOUT,
+        socket_connect_timeout=config.REDIS_CONNECT_TIMEOUT,
+        socket_timeout=config.REDIS_SOCKET_TIMEOUT,
+        retry_on_timeout=config.REDIS_RETRY_ON_TIMEOUT,
+        health_check_interval=config.REDIS_HEALTH_CHECK_INTERVAL,
+        protocol=config.REDIS_PROTOCOL,
+        **address,
+    )
+    return Redis.from_pool(pool)
+
+
+def redis_pool_stats(client: Redis) -> dict[str, int]:
+    pool = client.connection_pool
+    return {
+        "max_connections": pool.max_connections,
+        "in_use_connections": len(pool._in_use_connections),  # noqa
+        "idle_connections": len(pool._available_connections),  # noqa
+    }
+
+
+def _dump(result: Any) -> Any:
+    if isinstance(result, list):
+        return [
+            item.model_dump(mode="json", by_alias=True, warnings=False)
+            for item in result
+        ]
+    return result.model_dump(mode="json", by_alias=True, warnings=False)
+
+
+class _Cached:
+    """A cached result kept as a model, as its JSON body or as both.
+
+    The body is exactly what the endpoint responds with, so whichever form
+    is missing is built on first use only.
+    """
+
+    __slots__ = ("result", "body")
+
+    def __init__(self, result: Any = None, body: bytes | None = None):
+        self.result = result
+        self.body = body
+
+    def get_result(self, model: Any) -> Any:
+        if self.result is None:
+            if self.body[:1] == b"[":
+                self.result = list_adapter(model).validate_json(self.body)
+            else:
+                self.result = model.model_validate_json(self.body)
+        return self.result
+
+    def get_body(self, model: Any) -> bytes:
+        if self.body is None:
+            self.body = dump_json(self.result, model)
+        return self.body
+
+
+def _get_local_cache(
+        prefix: str, ttl: int, maxsize: int, max_bytes: int
+) -> LocalCache | None:
+    if not (config.LOCAL_CACHE_ENABLED and ttl):
+        return None
+    if prefix in local_caches:
+        return local_caches[prefix]
+    return LocalCache(prefix, maxsize, ttl, max_bytes)
+
+
+def _remember(
+        local_cache: LocalCache | None, cache_key: str, cached_result: bytes
+) -> tuple[CacheEntry, _Cached]:
+    entry = entry_codec.unpack(cached_result)
+    cached = _Cached(body=entry_codec.to_json(entry.payload))
+    if local_cache and time.time() < entry.expires_at:
+        local_cache.set(cache_key, cached, len(cached.body))
+    return entry, cached
+
+
+def _jitter(ttl: int, jitter: float) -> float:
+    return ttl * random.uniform(1 - jitter, 1 + jitter)
+
+
+def _queue_tags(
+        pipe,
+        cache_key: str,
+        tags: Iterable[str],
+        expire_ms: int,
+        tags_expire_ms: int,
+) -> None:
+    """Adds the entry to its tag sets, scored by when it expires.
+
+    Members whose entries have expired are trimmed on every write, so the
+    sets of hot tags don't keep every key that ever depended on them.
+    """
+    now_ms = int(time.time() * 1000)
+    for tag in tags:
+        pipe.zadd(tag_key(tag), {cache_key: now_ms + expire_ms})
+        pipe.zremrangebyscore(tag_key(tag), "-inf", now_ms)
+        pipe.pexpire(tag_key(tag), tags_expire_ms)
+
+
+def _max_expire_ms(ttl: int, stale_ttl: int, jitter: float) -> int:
+    return int((ttl * (1 + jitter) + stale_ttl) * 1000)
+
+
+def _pack(
+        result: Any, ttl: int, stale_ttl: int, jitter: float, delta: float
+) -> tuple[bytes, int, int]:
+    """Returns the Redis entry for a result, its lifetime in ms and size.
+
+    The size is that of the uncompressed payload, which is what the local
+    cache is charged for the result.
+    """
+    entry_ttl = _jitter(ttl, jitter)
+    payload = entry_codec.codec.dumps(_dump(result))
+    cached_result = entry_codec.pack(payload, time.time() + entry_ttl, delta)
+    return (
+        cached_result,
+        int((entry_ttl + stale_ttl) * 1000),
+        len(payload),
+    )
+
+
+def _should_refresh(
+        expires_at: float, delta: float, beta: float, now: float
+) -> bool:
+    """Expired, or picked for an early refresh by XFetch.
+
+    The closer the entry is to expiry and the longer it took to compute,
+    the more likely a reader refreshes it before it expires.
+    """
+    if now >= expires_at:
+        return True
+    if not beta:
+        return False
+    return now - delta * beta * math.log(1 - random.random()) >= expires_at
+
+
+def _normalize(value: Any) -> Any:
+    if isinstance(value, str):
+        return " ".join(value.split())
+    if isinstance(value, (list, tuple)):
+        return [_normalize(item) for item in value]
+    if isinstance(value, dict):
+        return {key: _normalize(item) for key, item in value.items()}
+    return value
+
+
+def build_cache_key(prefix: str, arguments: dict[str, Any]) -> str:
+    """Builds ``prefix:key`` from the arguments of a cached call.
+
+    A single id-like argument is used as is, so entities stay addressable as
+    ``film:<id>``. Anything else is normalized, serialized with sorted names
+    and hashed, so equal calls share a key however they were spelled.
+    """
+    values = list(arguments.values())
+    if len(values) == 1 and isinstance(values[0], (str, int, UUID)):
+        return f"{prefix}:{_normalize(values[0])}"
+    canonical = json.dumps(
+        _normalize(arguments),
+        sort_keys=True,
+        separators=(",", ":"),
+        default=str,
+    )
+    digest = hashlib.blake2b(canonical.encode("utf-8"), digest_size=16)
+    return f"{prefix}:{digest.hexdigest()}"
+
+
+async def _wait_for_key(
+        redis_client: Redis, cache_key: str, timeout: float
+) -> bytes | None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        await asyncio.sleep(config.CACHE_LOCK_POLL_INTERVAL)
+        cached_result = await redis_client.get(cache_key)
+        if cached_result:
+            try:
+                entry = entry_codec.unpack(cached_result)
+            except ValueError:
+                logger.warning("Dropping malformed entry '%s'", cache_key)
+                return None
+            if entry.expires_at > time.time():
+                return cached_result
+
+
+class CachedMethod:
+    """Method wrapped by ``redis_cache``.
+
+    Calling it returns models. ``raw`` returns the JSON body of the same
+    result, or None when there is none, and serves it straight from
+    the cache without building models.
+    """
+
+    def __init__(self, func: Callable, fetch: Callable, local_cache):
+        update_wrapper(self, func)
+        self._fetch = fetch
+        self.local_cache = local_cache
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        return BoundCachedMethod(self, instance)
+
+    async def __call__(self, *args, **kwargs):
+        return await self._fetch(args, kwargs, as_body=False)
+
+    async def raw(self, *args, **kwargs) -> bytes | None:
+        return await self._fetch(args, kwargs, as_body=True)
+
+
+class BoundCachedMethod:
+    __slots__ = ("method", "instance")
+
+    def __init__(self, method: CachedMethod, instance: Any):
+        self.method = method
+        self.instance = instance
+
+    @property
+    def local_cache(self) -> LocalCache | None:
+        return self.method.local_cache
+
+    async def __call__(self, *args, **kwargs):
+        return await self.method(self.instance, *args, **kwargs)
+
+    async def raw(self, *args, **kwargs) -> bytes | None:
+        return await self.method.raw(self.instance, *args, **kwargs)
+
+
+def redis_cache(
+        prefix: str,
+        model: Any,
+        ttl: int = config.CACHE_TTL,
+        stale_ttl: int = config.CACHE_STALE_TTL,
+        early_refresh_beta: float = config.CACHE_EARLY_REFRESH_BETA,
+        ttl_jitter: float = config.CACHE_TTL_JITTER,
+        local_ttl: int = 0,
+        local_maxsize: int = config.LOCAL_CACHE_MAXSIZE,
+        local_max_bytes: int = config.LOCAL_CACHE_MAX_BYTES,
+        lock_timeout: float = config.CACHE_LOCK_TIMEOUT,
+        tags: Callable[[Any], Iterable[str]] | None = None,
+):
+    """Caches results in Redis under ``prefix:key``.
+
+    The key is built from all the arguments of the call, see
+    ``build_cache_key``. Results are stored as their JSON response body,
+    encoded with the configured ``entry_codec``.
+
+    Entries live for ``ttl`` seconds, spread by ``ttl_jitter`` so they don't
+    expire together. An expired entry is kept for ``stale_ttl`` more seconds
+    and served while a background task refreshes it. A non-zero
+    ``early_refresh_beta`` starts that refresh ahead of expiry
+    (probabilistic early expiration, XFetch).
+
+    A non-zero ``local_ttl`` also keeps the results in a per-process LRU
+    cache in front of Redis, so hot keys are served without network I/O.
+
+    Concurrent misses for the same key share one call of the decorated
+    method. A non-zero ``lock_timeout`` extends that across processes: the
+    first one takes a short Redis lock and the rest wait for its result
+    for up to ``lock_timeout`` seconds before calling the method themselves.
+
+    ``tags`` maps a result to the entities it was built from, so that
+    ``cache_invalidation.purge`` drops the entry when any of them changes.
+    """
 
-def redis_cache(prefix: str, model: Any, ttl: int = 1200):
     def decorator(func: Callable):
-        @wraps(func)
-        async def wrapper(*args, **kwargs):
-            self, key = args
-            cache_key = f"{prefix}:{key}"
+        local_cache = _get_local_cache(
+            prefix, local_ttl, local_maxsize, local_max_bytes
+        )
+        tags_expire_ms = _max_expire_ms(ttl, stale_ttl, ttl_jitter)
+        signature = inspect.signature(func)
+        flights = SingleFlight()
+        metrics = CacheMetrics(prefix)
+        load_result = traced(func.__qualname__)(
+            elastic_caller(func.__qualname__)(func)
+        )
 
-            cached_result = await self.redis.get(cache_key)
-            if cached_result:
-                parsed_result = json.loads(cached_result.decode("utf-8"))
-                if isinstance(parsed_result, list):
-                    return [model(**result) for result in parsed_result]
-                return model(**parsed_result)
+        async def load(
+                cache_key: str, args: tuple, kwargs: dict
+        ) -> _Cached | None:
+            self = args[0]
+            lock = None
+            if lock_timeout:
+                lock = self.redis.lock(
+                    f"lock:{cache_key}", timeout=lock_timeout, blocking=False
+                )
+                if not await lock.acquire():
+                    lock = None
+                    cached_result = await _wait_for_key(
+                        self.redis, cache_key, lock_timeout
+                    )
+                    if cached_result:
+                        try:
+                            _, cached = _remember(
+                                local_cache, cache_key, cached_result
+                            )
+                        except ValueError:
+                            logger.warning(
+                                "Dropping malformed entry '%s'", cache_key
+                            )
+                        else:
+                            return cached
+
+            try:
+                started = time.monotonic()
+                result = await load_result(*args, **kwargs)
+                delta = time.monotonic() - started
+
+                if result is None:
+                    return None
+
+                cached_result, expire_ms, size = _pack(
+                    result, ttl, stale_ttl, ttl_jitter, delta
+                )
+                async with self.redis.pipeline(transaction=False) as pipe:
+                    pipe.set(cache_key, cached_result, px=expire_ms)
+                    if tags:
+                        _queue_tags(
+                            pipe,
+                            cache_key,
+                            tags(result),
+                            expire_ms,
+                            tags_expire_ms,
+                        )
+                    await pipe.execute()
+                metrics.sets.inc()
+                cached = _Cached(result=result)
+                if local_cache:
+                    local_cache.set(cache_key, cached, size)
+                return cached
+            finally:
+                if lock:
+                    try:
+                        await lock.release()
+                    except LockError:
+                        logger.warning(
+                            "Cache lock for '%s' has expired", cache_key
+                        )
+
+        async def refresh(
+                cache_key: str, args: tuple, kwargs: dict
+        ) -> _Cached | None:
+            """Reloads a stale entry and drops it if the result is gone.
+
+            Misses of the same key join the refresh, so it returns the
+            result and raises what ``load`` raises.
+            """
+            try:
+                cached = await load(cache_key, args, kwargs)
+            except Exception:  # noqa
+                logger.exception("Failed to refresh '%s'", cache_key)
+                raise
+            if cached is None:
+                if local_cache:
+                    local_cache.delete(cache_key)
+                await args[0].redis.delete(cache_key)
+            return cached
 
-            result = await func(*args, **kwargs)
+        async def lookup(
+                cache_key: str, args: tuple, kwargs: dict
+        ) -> _Cached | None:
+            if local_cache:
+                cached = local_cache.get(cache_key)
+                if cached is not None:
+                    metrics.local_hits.inc()
+                    return cached
 
-            if result:
-                if isinstance(result, list):
-                    serialized_data = json.dumps(
-                        [item.dict() for item in result], cls=UUIDEncoder
+            self = args[0]
+            cached_result = await self.redis.get(cache_key)
+            if cached_result:
+                try:
+                    entry, cached = _remember(
+                        local_cache, cache_key, cached_result
                     )
+                except ValueError:
+                    logger.warning("Dropping malformed entry '%s'", cache_key)
                 else:
-                    serialized_data = json.dumps(
-                        result.dict(), cls=UUIDEncoder
+                    if _should_refresh(
+                            entry.expires_at,
+                            entry.delta,
+                            early_refresh_beta,
+                            time.time(),
+                    ):
+                        flights.start(
+                            cache_key,
+                            lambda: refresh(cache_key, args, kwargs),
+                        )
+                    metrics.hits.inc()
+                    return cached
+
+            metrics.misses.inc()
+            return await flights.do(
+                cache_key, lambda: load(cache_key, args, kwargs)
+            )
+
+        async def fetch(args: tuple, kwargs: dict, as_body: bool):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            _, *arguments = bound.arguments.items()
+            cache_key = build_cache_key(prefix, dict(arguments))
+
+            cached = await lookup(cache_key, args, kwargs)
+            if cached is None:
+                return None
+            try:
+                if as_body:
+                    return cached.get_body(model)
+                return cached.get_result(model)
+            except ValidationError:
+                logger.exception("Dropping malformed entry '%s'", cache_key)
+                if local_cache:
+                    local_cache.delete(cache_key)
+                await args[0].redis.delete(cache_key)
+                return None
+
+        return CachedMethod(
+            func, traced(f"cache.{prefix}")(fetch), local_cache
+        )
+
+    return decorator
+
+
+def redis_cache_many(
+        prefix: str,
+        model: Any,
+        ttl: int = config.CACHE_TTL,
+        stale_ttl: int = config.CACHE_STALE_TTL,
+        early_refresh_beta: float = config.CACHE_EARLY_REFRESH_BETA,
+        ttl_jitter: float = config.CACHE_TTL_JITTER,
+        local_ttl: int = 0,
+        local_maxsize: int = config.LOCAL_CACHE_MAXSIZE,
+        local_max_bytes: int = config.LOCAL_CACHE_MAX_BYTES,
+        tags: Callable[[Any], Iterable[str]] | None = None,
+):
+    """Caches entities one per key for methods that load many ids at once.
+
+    The decorated method takes a list of ids and returns the entities it
+    has found. Cached entities are read with a single MGET from
+    ``prefix:<id>``, the keys ``redis_cache`` uses for the same entities,
+    only the missing ids are passed on to the method and what it returns is
+    written back in one pipeline. The wrapper returns the entities in the
+    order of the ids, skipping the ones that weren't found. ``tags`` is
+    applied to every entity, as in ``redis_cache``.
+    """
+
+    def decorator(func: Callable):
+        local_cache = _get_local_cache(
+            prefix, local_ttl, local_maxsize, local_max_bytes
+        )
+        tags_expire_ms = _max_expire_ms(ttl, stale_ttl, ttl_jitter)
+        flights = SingleFlight()
+        metrics = CacheMetrics(prefix)
+        load_results = traced(func.__qualname__)(
+            elastic_caller(func.__qualname__)(func)
+        )
+
+        async def load(self, ids: list[str]) -> dict[str, _Cached]:
+            started = time.monotonic()
+            results = await load_results(self, ids)
+            delta = time.monotonic() - started
+
+            loaded = {}
+            async with self.redis.pipeline(transaction=False) as pipe:
+                for result in results:
+                    cache_key = f"{prefix}:{result.id}"
+                    cached_result, expire_ms, size = _pack(
+                        result, ttl, stale_ttl, ttl_jitter, delta
                     )
-                await self.redis.set(
-                    cache_key,
-                    serialized_data,
-                    ex=ttl,
+                    pipe.set(cache_key, cached_result, px=expire_ms)
+                    if tags:
+                        _queue_tags(
+                            pipe,
+                            cache_key,
+                            tags(result),
+                            expire_ms,
+                            tags_expire_ms,
+                        )
+                    cached = loaded[str(result.id)] = _Cached(result=result)
+                    if local_cache:
+                        local_cache.set(cache_key, cached, size)
+                await pipe.execute()
+            metrics.sets.inc(len(loaded))
+            return loaded
+
+        async def refresh(self, ids: list[str]) -> None:
+            try:
+                await load(self, ids)
+            except Exception:  # noqa
+                logger.exception("Failed to refresh %s '%s'", prefix, ids)
+
+        @wraps(func)
+        async def wrapper(self, ids: list[str]) -> list:
+            ids = list(dict.fromkeys(str(doc_id) for doc_id in ids))
+            found: dict[str, _Cached] = {}
+            if local_cache:
+                for doc_id in ids:
+                    cached = local_cache.get(f"{prefix}:{doc_id}")
+                    if cached is not None:
+                        found[doc_id] = cached
+                metrics.local_hits.inc(len(found))
+
+            remaining = [doc_id for doc_id in ids if doc_id not in found]
+            stale = []
+            if remaining:
+                cached_results = await self.redis.mget(
+                    [f"{prefix}:{doc_id}" for doc_id in remaining]
                 )
+                for doc_id, cached_result in zip(remaining, cached_results):
+                    if not cached_result:
+                        continue
+                    try:
+                        entry, found[doc_id] = _remember(
+                            local_cache, f"{prefix}:{doc_id}", cached_result
+                        )
+                    except ValueError:
+                        logger.warning(
+                            "Dropping malformed entry '%s:%s'", prefix, doc_id
+                        )
+                        continue
+                    if _should_refresh(
+                            entry.expires_at,
+                            entry.delta,
+                            early_refresh_beta,
+                            time.time(),
+                    ):
+                        stale.append(doc_id)
 
-            return result
+            if stale:
+                flights.start(
+                    ",".join(stale), lambda: refresh(self, stale)
+                )
+            missing = [doc_id for doc_id in remaining if doc_id not in found]
+            metrics.hits.inc(len(remaining) - len(missing))
+            metrics.misses.inc(len(missing))
+            if missing:
+                found.update(await load(self, missing))
+
+            results = []
+            for doc_id in ids:
+                if doc_id not in found:
+                    continue
+                try:
+                    results.append(found[doc_id].get_result(model))
+                except ValidationError:
+                    logger.exception(
+                        "Dropping malformed entry '%s:%s'", prefix, doc_id
+                    )
+            return results
 
-        return wrapper
+        return traced(f"cache.{prefix}")(wrapper)
 
     return decorator
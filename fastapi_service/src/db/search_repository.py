@@ -1,12 +1,54 @@
 from abc import ABC, abstractmethod
+from typing import AsyncIterator
+
+from pydantic import BaseModel
+
+
+def source_fields(model: type[BaseModel]) -> list[str]:
+    """The document fields ``model`` is built from, for ``_source``."""
+    return list(model.model_fields)
 
 
 class SearchRepository(ABC):
 
     @abstractmethod
-    async def search(self, query: dict) -> list[dict]:
+    async def search(self, query: dict | bytes) -> list[dict]:
+        """Returns the hits of ``query``, a body or its rendered JSON."""
+        pass
+
+    @abstractmethod
+    async def search_after(
+            self, query: dict, cursor: str | None
+    ) -> tuple[list[dict], str | None]:
+        """Returns a page of hits and the cursor of the next page.
+
+        ``cursor`` is None for the first page, and the returned cursor is
+        None after the last one.
+        """
+        pass
+
+    @abstractmethod
+    async def get(
+            self, doc_id: str, source: list[str] | None = None
+    ) -> dict:
         pass
 
     @abstractmethod
-    async def get(self, doc_id: str) -> dict:
+    async def get_many(
+            self, doc_ids: list[str], source: list[str] | None = None
+    ) -> list[dict | None]:
+        """Returns the documents in the order of ``doc_ids``.
+
+        A document that does not exist is None in its place.
+        """
         pass
+
+    async def scan(self, query: dict) -> AsyncIterator[dict]:
+        """Yields the ``_source`` of every hit, ``size`` hits at a time."""
+        cursor = None
+        while True:
+            hits, cursor = await self.search_after(query, cursor)
+            for hit in hits:
+                yield hit["_source"]
+            if not cursor:
+                return
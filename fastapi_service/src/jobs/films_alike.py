@@ -0,0 +1,279 @@
+"""Precomputes the films alike of every film into Redis.
+
+Run it next to the API with
+``python -m fastapi_service.src.jobs.films_alike``. The job loads the films
+index once, writes the top films of every film to ``alike:<film_id>`` as
+the ready response body and then keeps the lists up to date from
+``film:<id>`` tags on the cache invalidation channel.
+"""
+
+import asyncio
+import heapq
+from collections import Counter, defaultdict
+from typing import Iterable
+
+from redis.asyncio import Redis
+
+from fastapi_service.src.core import config
+from fastapi_service.src.core.logger import logger
+from fastapi_service.src.db.cache_invalidation import InvalidationListener
+from fastapi_service.src.db.elastic import (
+    ElasticsearchRepository,
+    create_elastic,
+)
+from fastapi_service.src.db.redis import create_redis
+from fastapi_service.src.db.search_repository import SearchRepository
+from fastapi_service.src.models.film import Film
+from fastapi_service.src.services.film import FILM_FIELDS, alike_key
+from fastapi_service.src.utils.serialization import dump_json, from_source
+
+ALIKE_FIELDS = [*FILM_FIELDS, "genres"]
+
+
+def _genres(doc: dict) -> frozenset[str]:
+    return frozenset(doc.get("genres") or ())
+
+
+class FilmsAlikeJob:
+    """Keeps the films sharing the most genres with every film in Redis.
+
+    A candidate scores its number of shared genres, weighted by its
+    ``imdb_rating``. Only the ``candidates`` best rated films of every genre
+    are scored, and films with the same genres share one ranking, so the
+    work grows with the number of genre combinations, not of films.
+
+    A change to a film rewrites its own list, and the lists of its genres
+    only when it enters, leaves or is one of their candidates. Lists expire
+    after ``ttl`` seconds unless a rebuild rewrites them, so the lists of
+    films removed while the job was down don't live on.
+    """
+
+    def __init__(
+            self,
+            redis: Redis,
+            elastic: SearchRepository,
+            top_k: int,
+            candidates: int,
+            batch_size: int,
+            ttl: int,
+    ):
+        self.redis = redis
+        self.elastic = elastic
+        self.top_k = top_k
+        self.candidates = candidates
+        self.batch_size = batch_size
+        self.ttl = ttl
+        self._films: dict[str, dict] = {}
+        self._by_genre: dict[str, set[str]] = defaultdict(set)
+        self._by_genres: dict[frozenset[str], set[str]] = defaultdict(set)
+        self._candidates: dict[str, list[str]] = {}
+        self._rankings: dict[frozenset[str], list[str]] = {}
+        self._lock = asyncio.Lock()
+
+    async def rebuild(self) -> int:
+        async with self._lock:
+            previous = set(self._films)
+            self._films = {}
+            self._by_genre = defaultdict(set)
+            self._by_genres = defaultdict(set)
+            async for doc in self.elastic.scan(
+                {
+                    "query": {"match_all": {}},
+                    "_source": ALIKE_FIELDS,
+                    "size": self.batch_size,
+                }
+            ):
+                self._add(doc)
+            self._candidates = {
+                genre: self._pick_candidates(genre)
+                for genre in self._by_genre
+            }
+            self._rankings = {
+                genres: self._rank(genres) for genres in self._by_genres
+            }
+            await self._write(self._films)
+            await self._delete(previous - self._films.keys())
+        logger.info("Precomputed films alike for %d films", len(self._films))
+        return len(self._films)
+
+    async def refresh(self, film_ids: list[str]) -> int:
+        """Reloads the films and rewrites every list they appear in."""
+        async with self._lock:
+            docs = await self.elastic.get_many(film_ids, source=ALIKE_FIELDS)
+            refreshed = set(film_ids)
+            touched_genres = set()
+            removed = []
+            for film_id, doc in zip(film_ids, docs):
+                if film_id in self._films:
+                    touched_genres |= _genres(self._films[film_id])
+                    self._remove(film_id)
+                if doc:
+                    self._add(doc)
+                    touched_genres |= _genres(doc)
+                else:
+                    removed.append(film_id)
+
+            changed_genres = set()
+            for genre in touched_genres:
+                candidates = self._pick_candidates(genre)
+                previous = self._candidates.get(genre, [])
+                if candidates != previous or not refreshed.isdisjoint(
+                        previous
+                ):
+                    changed_genres.add(genre)
+                if candidates:
+                    self._candidates[genre] = candidates
+                else:
+                    self._candidates.pop(genre, None)
+
+            changed = refreshed & self._films.keys()
+            for genres in list(self._rankings):
+                if genres not in self._by_genres:
+                    del self._rankings[genres]
+            for genres, genre_film_ids in self._by_genres.items():
+                # The ranking of films without genres depends on every film.
+                if (
+                        genres
+                        and genres in self._rankings
+                        and genres.isdisjoint(changed_genres)
+                ):
+                    continue
+                ranking = self._rank(genres)
+                if ranking != self._rankings.get(genres) or not (
+                        refreshed.isdisjoint(ranking)
+                ):
+                    changed |= genre_film_ids
+                self._rankings[genres] = ranking
+
+            await self._write(changed)
+            await self._delete(removed)
+        return len(changed)
+
+    async def handle_tags(self, tags: list[str]) -> None:
+        film_ids = [
+            tag.split(":", 1)[1] for tag in tags if tag.startswith("film:")
+        ]
+        if film_ids:
+            refreshed = await self.refresh(film_ids)
+            logger.info(
+                "Refreshed %d films alike lists for %s", refreshed, film_ids
+            )
+
+    def _add(self, doc: dict) -> None:
+        self._films[doc["id"]] = doc
+        genres = _genres(doc)
+        self._by_genres[genres].add(doc["id"])
+        for genre in genres:
+            self._by_genre[genre].add(doc["id"])
+
+    def _remove(self, film_id: str) -> None:
+        genres = _genres(self._films.pop(film_id))
+        self._by_genres[genres].discard(film_id)
+        if not self._by_genres[genres]:
+            del self._by_genres[genres]
+        for genre in genres:
+            self._by_genre[genre].discard(film_id)
+            if not self._by_genre[genre]:
+                del self._by_genre[genre]
+
+    def _weight(self, film_id: str) -> float:
+        return 1 + (self._films[film_id].get("imdb_rating") or 0) / 10
+
+    def _pick_candidates(self, genre: str) -> list[str]:
+        return heapq.nlargest(
+            self.candidates,
+            self._by_genre.get(genre, ()),
+            key=lambda film_id: (self._weight(film_id), film_id),
+        )
+
+    def _rank(self, genres: frozenset[str]) -> list[str]:
+        """The best films for the genres, one more than a list holds.
+
+        The extra film stands in for the film itself in its own list. Films
+        without genres get the best rated films.
+        """
+        if not genres:
+            return heapq.nlargest(
+                self.top_k + 1,
+                self._films,
+                key=lambda other_id: (self._weight(other_id), other_id),
+            )
+        shared_genres = Counter()
+        for genre in genres:
+            shared_genres.update(self._candidates.get(genre, ()))
+        return heapq.nlargest(
+            self.top_k + 1,
+            shared_genres,
+            key=lambda other_id: (
+                shared_genres[other_id] * self._weight(other_id),
+                other_id,
+            ),
+        )
+
+    def _dump(self, film_ids: list[str]) -> bytes:
+        return dump_json(
+            [from_source(Film, self._films[film_id]) for film_id in film_ids],
+            Film,
+        )
+
+    async def _write(self, film_ids: Iterable[str]) -> None:
+        film_ids = list(film_ids)
+        # Films outside their own ranking all get the same list.
+        shared_bodies: dict[frozenset[str], bytes] = {}
+        for start in range(0, len(film_ids), self.batch_size):
+            async with self.redis.pipeline(transaction=False) as pipe:
+                for film_id in film_ids[start:start + self.batch_size]:
+                    genres = _genres(self._films[film_id])
+                    ranking = self._rankings[genres]
+                    if film_id in ranking:
+                        body = self._dump(
+                            [
+                                other_id
+                                for other_id in ranking
+                                if other_id != film_id
+                            ][:self.top_k]
+                        )
+                    else:
+                        if genres not in shared_bodies:
+                            shared_bodies[genres] = self._dump(
+                                ranking[:self.top_k]
+                            )
+                        body = shared_bodies[genres]
+                    pipe.set(alike_key(film_id), body, ex=self.ttl)
+                await pipe.execute()
+
+    async def _delete(self, film_ids: Iterable[str]) -> None:
+        film_ids = list(film_ids)
+        for start in range(0, len(film_ids), self.batch_size):
+            await self.redis.delete(
+                *map(alike_key, film_ids[start:start + self.batch_size])
+            )
+
+
+async def main() -> None:
+    redis = create_redis()
+    elastic = create_elastic()
+    job = FilmsAlikeJob(
+        redis,
+        ElasticsearchRepository(elastic, config.ELASTIC_FILM_INDEX),
+        top_k=config.FILMS_ALIKE_TOP_K,
+        candidates=config.FILMS_ALIKE_CANDIDATES,
+        batch_size=config.FILMS_ALIKE_BATCH_SIZE,
+        ttl=config.FILMS_ALIKE_TTL,
+    )
+    listener = InvalidationListener(
+        redis, config.CACHE_INVALIDATION_CHANNEL, handler=job.handle_tags
+    )
+    await listener.start()
+    try:
+        while True:
+            await job.rebuild()
+            await asyncio.sleep(config.FILMS_ALIKE_REBUILD_INTERVAL)
+    finally:
+        await listener.stop()
+        await redis.close()
+        await elastic.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,178 @@
+"""Precomputes the film works of every person into a Redis hash.
+
+Run it next to the API with
+``python -m fastapi_service.src.jobs.person_films``. The job builds the
+``person_films`` hash, person id to the JSON list of their film works,
+under a temporary key and renames it into place, so readers never see a
+half-built hash. It then keeps the hash up to date from ``film:<id>`` tags
+on the cache invalidation channel.
+"""
+
+import asyncio
+from collections import defaultdict
+from typing import Iterable
+
+from redis.asyncio import Redis
+
+from fastapi_service.src.core import config
+from fastapi_service.src.core.logger import logger
+from fastapi_service.src.db.cache_invalidation import (
+    InvalidationListener,
+    invalidate,
+)
+from fastapi_service.src.db.elastic import (
+    ElasticsearchRepository,
+    create_elastic,
+)
+from fastapi_service.src.db.redis import create_redis
+from fastapi_service.src.db.search_repository import SearchRepository
+from fastapi_service.src.models.person_film_work import PersonFilmWork, ROLES
+from fastapi_service.src.services.film import PERSON_FILMS_KEY
+from fastapi_service.src.utils.serialization import dump_json
+
+PERSON_FILMS_FIELDS = ["id", *(f"{role}.id" for role in ROLES)]
+
+
+def _film_roles(doc: dict) -> dict[str, list[str]]:
+    roles_by_person = defaultdict(list)
+    for role in ROLES:
+        for person in doc.get(role) or []:
+            roles_by_person[person["id"]].append(role.rstrip("s"))
+    return roles_by_person
+
+
+class PersonFilmsJob:
+    """Keeps the ``person_films`` hash in step with the films index."""
+
+    def __init__(
+            self, redis: Redis, elastic: SearchRepository, batch_size: int
+    ):
+        self.redis = redis
+        self.elastic = elastic
+        self.batch_size = batch_size
+        self._film_persons: dict[str, set[str]] = {}
+        self._person_films: dict[str, dict[str, list[str]]] = defaultdict(
+            dict
+        )
+        self._lock = asyncio.Lock()
+
+    async def rebuild(self) -> int:
+        async with self._lock:
+            self._film_persons = {}
+            self._person_films = defaultdict(dict)
+            async for doc in self.elastic.scan(
+                {
+                    "query": {"match_all": {}},
+                    "_source": PERSON_FILMS_FIELDS,
+                    "size": self.batch_size,
+                }
+            ):
+                self._add(doc)
+            tmp_key = f"{PERSON_FILMS_KEY}:tmp"
+            await self.redis.delete(tmp_key)
+            await self._write(tmp_key, list(self._person_films))
+            if self._person_films:
+                await self.redis.rename(tmp_key, PERSON_FILMS_KEY)
+            else:
+                await self.redis.delete(PERSON_FILMS_KEY)
+        logger.info(
+            "Precomputed film works of %d persons", len(self._person_films)
+        )
+        return len(self._person_films)
+
+    async def refresh(self, film_ids: list[str]) -> int:
+        """Reloads the films and rewrites the entries of their persons.
+
+        The cached pages of those persons are invalidated once their entries
+        are written, so API workers that rebuilt a page from the old entry
+        in the meantime, or never tagged it with a newly added film, drop it.
+        """
+        async with self._lock:
+            docs = await self.elastic.get_many(
+                film_ids, source=PERSON_FILMS_FIELDS
+            )
+            affected = set()
+            for film_id, doc in zip(film_ids, docs):
+                affected |= self._remove(film_id)
+                if doc:
+                    affected |= self._add(doc)
+            await self._write(PERSON_FILMS_KEY, affected)
+        if affected:
+            await invalidate(
+                self.redis, [f"person:{person_id}" for person_id in affected]
+            )
+        return len(affected)
+
+    async def handle_tags(self, tags: list[str]) -> None:
+        film_ids = [
+            tag.split(":", 1)[1] for tag in tags if tag.startswith("film:")
+        ]
+        if film_ids:
+            refreshed = await self.refresh(film_ids)
+            logger.info(
+                "Refreshed film works of %d persons for %s",
+                refreshed,
+                film_ids,
+            )
+
+    def _add(self, doc: dict) -> set[str]:
+        roles_by_person = _film_roles(doc)
+        for person_id, roles in roles_by_person.items():
+            self._person_films[person_id][doc["id"]] = roles
+        self._film_persons[doc["id"]] = set(roles_by_person)
+        return set(roles_by_person)
+
+    def _remove(self, film_id: str) -> set[str]:
+        person_ids = self._film_persons.pop(film_id, set())
+        for person_id in person_ids:
+            self._person_films[person_id].pop(film_id, None)
+        return person_ids
+
+    async def _write(self, key: str, person_ids: Iterable[str]) -> None:
+        person_ids = list(person_ids)
+        for start in range(0, len(person_ids), self.batch_size):
+            async with self.redis.pipeline(transaction=False) as pipe:
+                for person_id in person_ids[start:start + self.batch_size]:
+                    film_works = self._person_films.get(person_id)
+                    if not film_works:
+                        self._person_films.pop(person_id, None)
+                        pipe.hdel(key, person_id)
+                        continue
+                    pipe.hset(
+                        key,
+                        person_id,
+                        dump_json(
+                            [
+                                PersonFilmWork(uuid=film_id, roles=roles)
+                                for film_id, roles in film_works.items()
+                            ],
+                            PersonFilmWork,
+                        ),
+                    )
+                await pipe.execute()
+
+
+async def main() -> None:
+    redis = create_redis()
+    elastic = create_elastic()
+    job = PersonFilmsJob(
+        redis,
+        ElasticsearchRepository(elastic, config.ELASTIC_FILM_INDEX),
+        batch_size=config.PERSON_FILMS_BATCH_SIZE,
+    )
+    listener = InvalidationListener(
+        redis, config.CACHE_INVALIDATION_CHANNEL, handler=job.handle_tags
+    )
+    await listener.start()
+    try:
+        while True:
+            await job.rebuild()
+            await asyncio.sleep(config.PERSON_FILMS_REBUILD_INTERVAL)
+    finally:
+        await listener.stop()
+        await redis.close()
+        await elastic.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,36 +1,150 @@
 from contextlib import asynccontextmanager
+from http import HTTPStatus
 
-from elasticsearch import AsyncElasticsearch
-from fastapi import FastAPI
-from fastapi.responses import JSONResponse
-from redis.asyncio import Redis
+from fastapi import FastAPI, Request, Response
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    generate_latest,
+)
 
 from fastapi_service.src.api.v1 import films, persons, genres
 from fastapi_service.src.core import config
-from fastapi_service.src.db import redis, elastic
+from fastapi_service.src.core.metrics import (
+    LocalCacheCollector,
+    MetricsMiddleware,
+    PoolStatsCollector,
+)
+from fastapi_service.src.core.tracing import SpanExporter, TracingMiddleware
+from fastapi_service.src.db.cache_invalidation import InvalidationListener
+from fastapi_service.src.db.elastic import (
+    SEARCH_FILTER_PATH,
+    ElasticsearchRepository,
+    create_elastic,
+    elastic_pool_stats,
+)
+from fastapi_service.src.db.local_cache import local_caches
+from fastapi_service.src.db.msearch import MsearchBatcher
+from fastapi_service.src.db.redis import create_redis, redis_pool_stats
+from fastapi_service.src.services.film import FilmService
+from fastapi_service.src.services.genre import GenreService
+from fastapi_service.src.services.genre_catalogue import GenreCatalogue
+from fastapi_service.src.services.person import PersonService
+from fastapi_service.src.utils.response import DefaultJSONResponse
 
 
 @asynccontextmanager
-async def lifespan(app: FastAPI):  # noqa
-    redis.redis = Redis(host=config.REDIS_HOST, port=config.REDIS_PORT)
-    elastic.es = AsyncElasticsearch(
-        hosts=[
-            f"{config.ELASTIC_SCHEME}://{config.ELASTIC_HOST}:{config.ELASTIC_PORT}"
-        ]
+async def lifespan(app: FastAPI):
+    """Builds the clients and services once, shared by every request."""
+    state = app.state
+    state.redis = create_redis()
+    state.elastic = create_elastic()
+    state.pool_stats = PoolStatsCollector(
+        {
+            "elasticsearch": lambda: elastic_pool_stats(state.elastic),
+            "redis": lambda: redis_pool_stats(state.redis),
+        }
+    )
+    REGISTRY.register(state.pool_stats)
+    state.local_cache_stats = LocalCacheCollector(local_caches)
+    REGISTRY.register(state.local_cache_stats)
+    state.msearch_batcher = None
+    if config.ELASTIC_MSEARCH_BATCHING:
+        state.msearch_batcher = MsearchBatcher(
+            state.elastic,
+            window=config.ELASTIC_MSEARCH_WINDOW_MS / 1000,
+            max_size=config.ELASTIC_MSEARCH_MAX_SIZE,
+            filter_path=SEARCH_FILTER_PATH,
+        )
+
+    def repository(index: str) -> ElasticsearchRepository:
+        return ElasticsearchRepository(
+            state.elastic, index, batcher=state.msearch_batcher
+        )
+
+    state.genre_catalogue = None
+    if config.GENRE_CATALOGUE_ENABLED:
+        state.genre_catalogue = GenreCatalogue(
+            repository(config.ELASTIC_GENRE_INDEX),
+            refresh_interval=config.GENRE_CATALOGUE_REFRESH_INTERVAL,
+            size=config.GENRE_CATALOGUE_SIZE,
+        )
+        await state.genre_catalogue.start()
+    state.invalidation_listener = InvalidationListener(
+        state.redis,
+        config.CACHE_INVALIDATION_CHANNEL,
+        on_purge=(
+            state.genre_catalogue.handle_tags
+            if state.genre_catalogue
+            else None
+        ),
+    )
+    await state.invalidation_listener.start()
+
+    state.genre_service = GenreService(
+        state.redis,
+        repository(config.ELASTIC_GENRE_INDEX),
+        state.genre_catalogue,
+    )
+    state.film_service = FilmService(
+        state.redis,
+        repository(config.ELASTIC_FILM_INDEX),
+        state.genre_service,
+    )
+    state.person_service = PersonService(
+        state.redis,
+        repository(config.ELASTIC_PERSON_INDEX),
+        state.film_service,
     )
     yield
-    await redis.redis.close()
-    await elastic.es.close()
+    await state.invalidation_listener.stop()
+    if state.genre_catalogue:
+        await state.genre_catalogue.stop()
+    if state.msearch_batcher:
+        await state.msearch_batcher.close()
+    REGISTRY.unregister(state.pool_stats)
+    REGISTRY.unregister(state.local_cache_stats)
+    await state.redis.close()
+    await state.elastic.close()
 
 
 app = FastAPI(
     title=config.PROJECT_NAME,
     docs_url="/api/docs",
     openapi_url="/api/openapi.json",
-    default_response_class=JSONResponse,
+    default_response_class=DefaultJSONResponse,
     lifespan=lifespan,
 )
 
 app.include_router(films.router)
 app.include_router(persons.router)
 app.include_router(genres.router)
+
+if config.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics() -> Response:
+        return Response(
+            generate_latest(REGISTRY), media_type=CONTENT_TYPE_LATEST
+        )
+
+if config.TRACING_ENABLED:
+    app.add_middleware(
+        TracingMiddleware,
+        exporter=(
+            SpanExporter(config.TRACING_EXPORT_PATH)
+            if config.TRACING_EXPORT_PATH
+            else None
+        ),
+    )
+
+
+@app.exception_handler(TimeoutError)
+async def timeout_error_handler(
+        request: Request, exc: TimeoutError  # noqa
+) -> DefaultJSONResponse:
+    return DefaultJSONResponse(
+        status_code=HTTPStatus.GATEWAY_TIMEOUT,
+        content={"detail": "Backend services timed out"},
+    )
@@ -1,23 +1,136 @@
+from collections import defaultdict
 from functools import lru_cache
 
-from elasticsearch import AsyncElasticsearch
-from fastapi import Depends
+from fastapi import Request
 from pydantic import ValidationError
 from redis.asyncio import Redis
 
 from fastapi_service.src.core import config
 from fastapi_service.src.core.logger import logger
-from fastapi_service.src.db.elastic import (
-    get_elastic,
-    ElasticsearchRepository,
+from fastapi_service.src.core.metrics import elastic_callers
+from fastapi_service.src.core.tracing import traced_methods
+from fastapi_service.src.db.elastic import ElasticsearchRepository
+from fastapi_service.src.db.query_templates import (
+    Param,
+    QueryTemplate,
+    dumps,
 )
-from fastapi_service.src.db.redis import get_redis, redis_cache
+from fastapi_service.src.db.redis import redis_cache, redis_cache_many
+from fastapi_service.src.db.search_repository import source_fields
 from fastapi_service.src.models.film import FilmDetails, Film
-from fastapi_service.src.models.genre import Genre
 from fastapi_service.src.models.person_film_work import PersonFilmWork, ROLES
-from fastapi_service.src.services.genre import GenreService, get_genre_service
+from fastapi_service.src.services.genre import GenreService
+from fastapi_service.src.utils.serialization import (
+    from_hits,
+    from_source,
+    list_adapter,
+)
+
+FILM_FIELDS = source_fields(Film)
+FILM_DETAILS_FIELDS = source_fields(FilmDetails)
+# Hash of person id to the JSON list of their film works, see jobs.
+PERSON_FILMS_KEY = "person_films"
+
+
+def _by_person_query(kind: str, field: str, value: Param) -> dict:
+    should_query = [
+        {
+            "nested": {
+                "path": role,
+                "query": {kind: {f"{role}.{field}": value}},
+            }
+        }
+        for role in ROLES
+    ]
+    return {"bool": {"should": should_query, "minimum_should_match": 1}}
+
+
+FILM_SEARCH_QUERY = QueryTemplate(
+    {
+        "query": {"multi_match": {"query": Param("query")}},
+        "_source": FILM_FIELDS,
+        "from": Param("offset"),
+        "size": Param("size"),
+    }
+)
+FILMS_QUERY = QueryTemplate(
+    {
+        "sort": Param("sort"),
+        "_source": FILM_FIELDS,
+        "from": Param("offset"),
+        "size": Param("size"),
+    }
+)
+FILMS_BY_GENRE_QUERY = QueryTemplate(
+    {
+        "query": {"match": {"genres": Param("genre")}},
+        "sort": Param("sort"),
+        "_source": FILM_FIELDS,
+        "from": Param("offset"),
+        "size": Param("size"),
+    }
+)
+FILMS_BY_PERSON_NAME_QUERY = QueryTemplate(
+    {
+        "query": _by_person_query("match", "name", Param("name")),
+        "_source": ["id", *(f"{role}.name" for role in ROLES)],
+    }
+)
+FILMS_BY_PERSON_IDS_QUERY = QueryTemplate(
+    {
+        "query": _by_person_query("terms", "id", Param("person_ids")),
+        "_source": ["id", *(f"{role}.id" for role in ROLES)],
+        "size": config.ELASTIC_MAX_RESULT_SIZE,
+    }
+)
+# One more than a list holds, to stand in for the film itself.
+FILMS_BY_GENRES_QUERY = QueryTemplate(
+    {
+        "query": {"bool": {"should": Param("should")}},
+        "sort": ["_score", {"imdb_rating": {"order": "desc"}}],
+        "_source": FILM_FIELDS,
+        "size": config.FILMS_ALIKE_TOP_K + 1,
+    }
+)
+
+
+def _films_sort(sort: str) -> list[dict]:
+    sort_field = sort.lstrip("-")
+    sort_order = "desc" if sort.startswith("-") else "asc"
+    return [{sort_field: {"order": sort_order}}]
+
+
+@lru_cache(maxsize=32)
+def _encoded_films_sort(sort: str) -> bytes:
+    return dumps(_films_sort(sort))
+
+
+def alike_key(film_id: str) -> str:
+    """Redis key of the precomputed films alike of a film, see jobs."""
+    return f"alike:{film_id}"
+
+
+def _film_tags(film: FilmDetails) -> list[str]:
+    return [
+        *(f"genre:{genre.id}" for genre in film.genres or []),
+        *(
+            f"person:{person.id}"
+            for role in ROLES
+            for person in getattr(film, role) or []
+        ),
+    ]
+
+
+def _films_tags(films: list[Film]) -> list[str]:
+    return [f"film:{film.id}" for film in films]
 
 
+def _film_summary_tags(film: Film) -> list[str]:
+    return [f"film:{film.id}"]
+
+
+@elastic_callers
+@traced_methods
 class FilmService:
     def __init__(
             self,
@@ -29,39 +142,98 @@ class FilmService:
         self.elastic = elastic
         self.genre_service = genre_service
 
-    @redis_cache("film", model=FilmDetails)
+    @redis_cache(
+        "film",
+        FilmDetails,
+        local_ttl=config.LOCAL_CACHE_TTL,
+        tags=_film_tags,
+    )
     async def get_by_id(self, film_id: str) -> FilmDetails:
-        try:
-            film_data = await self.elastic.get(doc_id=film_id)
-            if film_data:
-                _genres = [
-                    await self.genre_service.get_by_name(genre_name)
-                    for genre_name in film_data["genres"]
-                ]
-                film_data["genres"] = _genres
-                return FilmDetails(**film_data)
-        except ValidationError:
-            logger.exception(
-                "Check a data structure of the document '%s'",
-                film_id,
+        film_data = await self.elastic.get(
+            doc_id=film_id, source=FILM_DETAILS_FIELDS
+        )
+        if film_data:
+            films = await self._build_film_details([film_data])
+            if films:
+                return films[0]
+
+    @redis_cache_many(
+        "film_summary",
+        Film,
+        local_ttl=config.LOCAL_CACHE_TTL,
+        tags=_film_summary_tags,
+    )
+    async def get_many(self, film_ids: list[str]) -> list[Film]:
+        films_data = await self.elastic.get_many(film_ids, source=FILM_FIELDS)
+        return [
+            from_source(Film, film_data)
+            for film_data in films_data
+            if film_data
+        ]
+
+    async def _build_film_details(
+            self, films_data: list[dict]
+    ) -> list[FilmDetails]:
+        genre_names = list(
+            dict.fromkeys(
+                genre_name
+                for film_data in films_data
+                for genre_name in film_data.get("genres") or []
             )
+        )
+        genres = {
+            genre.name.lower(): genre
+            for genre in await self.genre_service.get_by_names(genre_names)
+        }
+        films = []
+        for film_data in films_data:
+            film_data["genres"] = [
+                genres[genre_name.lower()]
+                for genre_name in film_data.get("genres") or []
+                if genre_name.lower() in genres
+            ]
+            try:
+                films.append(FilmDetails(**film_data))
+            except ValidationError:
+                logger.exception(
+                    "Check a data structure of the document '%s'",
+                    film_data.get("id"),
+                )
+        return films
 
+    @redis_cache(
+        "film_search",
+        Film,
+        local_ttl=config.LOCAL_CACHE_TTL,
+        tags=_films_tags,
+    )
     async def search(
             self, query: str, page_number: int, page_size: int
     ) -> list[Film]:
+        es_query = FILM_SEARCH_QUERY.render(
+            query=query, offset=(page_number - 1) * page_size, size=page_size
+        )
+        hits = await self.elastic.search(body=es_query)
+        films = from_hits(Film, hits)
+        return films
+
+    async def search_page(
+            self, query: str, cursor: str | None, page_size: int
+    ) -> tuple[list[Film], str | None]:
         es_query = {
-            "query": {
-                "multi_match": {
-                    "query": query,
-                }
-            },
-            "from": (page_number - 1) * page_size,
+            **self._search_query(query),
+            "sort": ["_score"],
             "size": page_size,
         }
-        hits = await self.elastic.search(body=es_query)
-        films = [Film(**hit["_source"]) for hit in hits]
-        return films
+        hits, next_cursor = await self.elastic.search_after(es_query, cursor)
+        return from_hits(Film, hits), next_cursor
 
+    @redis_cache(
+        "film_list",
+        Film,
+        local_ttl=config.LOCAL_CACHE_TTL,
+        tags=_films_tags,
+    )
     async def get_films(
             self,
             sort: str,
@@ -69,38 +241,58 @@ class FilmService:
             page_size: int,
             genre_id: str = None,
     ) -> list[Film]:
-        sort_field = sort.lstrip("-")
-        sort_order = "desc" if sort.startswith("-") else "asc"
-        es_query = {
-            "sort": [{sort_field: {"order": sort_order}}],
-            "from": (page_number - 1) * page_size,
+        params = {
+            "sort": _encoded_films_sort(sort),
+            "offset": (page_number - 1) * page_size,
             "size": page_size,
         }
         if genre_id:
             genre = await self.genre_service.get_by_id(genre_id)
-            es_query["query"] = {"match": {"genres": genre.name}}
+            if not genre:
+                return []
+            es_query = FILMS_BY_GENRE_QUERY.render(genre=genre.name, **params)
+        else:
+            es_query = FILMS_QUERY.render(**params)
         hits = await self.elastic.search(body=es_query)
-        films = [Film(**hit["_source"]) for hit in hits]
+        films = from_hits(Film, hits)
         return films
 
+    async def get_films_page(
+            self,
+            sort: str,
+            cursor: str | None,
+            page_size: int,
+            genre_id: str = None,
+    ) -> tuple[list[Film], str | None]:
+        es_query = {
+            "sort": _films_sort(sort),
+            "_source": FILM_FIELDS,
+            "size": page_size,
+        }
+        if genre_id:
+            genre = await self.genre_service.get_by_id(genre_id)
+            if not genre:
+                return [], None
+            es_query["query"] = {"match": {"genres": genre.name}}
+        hits, next_cursor = await self.elastic.search_after(es_query, cursor)
+        return from_hits(Film, hits), next_cursor
+
+    @staticmethod
+    def _search_query(query: str) -> dict:
+        return {
+            "query": {
+                "multi_match": {
+                    "query": query,
+                }
+            },
+            "_source": FILM_FIELDS,
+        }
+
     async def get_by_person_name(
             self, person_name: str
     ) -> list[PersonFilmWork]:
         person_film_works = []
-        should_query = [
-            {
-                "nested": {
-                    "path": role,
-                    "query": {"match": {f"{role}.name": person_name}},
-                }
-            }
-            for role in ROLES
-        ]
-        es_query = {
-            "query": {
-                "bool": {"should": should_query, "minimum_should_match": 1}
-            }
-        }
+        es_query = FILMS_BY_PERSON_NAME_QUERY.render(name=person_name)
         hits = await self.elastic.search(body=es_query)
         for hit in hits:
             film_data = hit["_source"]
@@ -117,47 +309,73 @@ class FilmService:
                 )
         return person_film_works
 
-    async def get_by_person_id(self, person_id: str) -> list[Film]:
-        should_query = [
-            {
-                "nested": {
-                    "path": role,
-                    "query": {"match": {f"{role}.id": person_id}},
-                }
-            }
-            for role in ROLES
-        ]
-        es_query = {
-            "query": {
-                "bool": {"should": should_query, "minimum_should_match": 1}
-            }
+    async def get_by_person_ids(
+            self, person_ids: list[str]
+    ) -> dict[str, list[PersonFilmWork]]:
+        if not person_ids:
+            return {}
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.exists(PERSON_FILMS_KEY)
+            pipe.hmget(PERSON_FILMS_KEY, person_ids)
+            exists, film_works = await pipe.execute()
+        if not exists:
+            return await self._search_by_person_ids(person_ids)
+        return {
+            person_id: (
+                list_adapter(PersonFilmWork).validate_json(data)
+                if data
+                else []
+            )
+            for person_id, data in zip(person_ids, film_works)
         }
+
+    async def _search_by_person_ids(
+            self, person_ids: list[str]
+    ) -> dict[str, list[PersonFilmWork]]:
+        person_film_works = {person_id: [] for person_id in person_ids}
+        es_query = FILMS_BY_PERSON_IDS_QUERY.render(person_ids=person_ids)
         hits = await self.elastic.search(body=es_query)
-        return [Film(**hit["_source"]) for hit in hits]
+        for hit in hits:
+            film_data = hit["_source"]
+            roles_by_person = defaultdict(list)
+            for role in ROLES:
+                for data in film_data.get(role) or []:
+                    if data["id"] in person_film_works:
+                        roles_by_person[data["id"]].append(role.rstrip("s"))
+            for person_id, _roles in roles_by_person.items():
+                person_film_works[person_id].append(
+                    PersonFilmWork(uuid=film_data["id"], roles=_roles)
+                )
+        return person_film_works
 
-    async def get_by_genres(self, genres: list[Genre]) -> list[Film]:
-        es_query = {
-            "query": {
-                "bool": {
-                    "should": [
-                        {"match": {"genres": genre.name}} for genre in genres
-                    ]
-                }
-            }
-        }
+    async def get_alike(self, film_id: str) -> bytes | None:
+        """The precomputed films alike response body, if the job wrote it."""
+        return await self.redis.get(alike_key(film_id))
+
+    async def get_alike_by_genres(self, film: FilmDetails) -> list[Film]:
+        """Films alike of a film the job hasn't written a list for yet."""
+        films = await self.get_by_genres(
+            sorted(genre.name for genre in film.genres or [])
+        )
+        # Trusted models may hold their ids as strings.
+        return [other for other in films if str(other.id) != str(film.id)][
+            :config.FILMS_ALIKE_TOP_K
+        ]
+
+    @redis_cache(
+        "film_genres",
+        Film,
+        local_ttl=config.LOCAL_CACHE_TTL,
+        tags=_films_tags,
+    )
+    async def get_by_genres(self, genre_names: list[str]) -> list[Film]:
+        es_query = FILMS_BY_GENRES_QUERY.render(
+            should=[{"match": {"genres": name}} for name in genre_names]
+        )
         hits = await self.elastic.search(body=es_query)
-        films = [Film(**hit["_source"]) for hit in hits]
+        films = from_hits(Film, hits)
         return films
 
 
-@lru_cache()
-def get_film_service(
-        redis: Redis = Depends(get_redis),
-        elastic: AsyncElasticsearch = Depends(get_elastic),
-        genre_service: GenreService = Depends(get_genre_service),
-) -> FilmService:
-    return FilmService(
-        redis,
-        ElasticsearchRepository(elastic, config.ELASTIC_FILM_INDEX),
-        genre_service
-    )
+async def get_film_service(request: Request) -> FilmService:
+    return request.app.state.film_service
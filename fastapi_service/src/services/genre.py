@@ -1,52 +1,115 @@
-from functools import lru_cache
-
-from elasticsearch import AsyncElasticsearch, NotFoundError
-from fastapi import Depends
+from elasticsearch import NotFoundError
+from fastapi import Request
 from redis.asyncio import Redis
 
 from fastapi_service.src.core import config
 from fastapi_service.src.core.logger import logger
-from fastapi_service.src.db.elastic import (
-    get_elastic,
-    ElasticsearchRepository,
-)
-from fastapi_service.src.db.redis import get_redis, redis_cache
+from fastapi_service.src.core.metrics import elastic_callers
+from fastapi_service.src.core.tracing import traced_methods
+from fastapi_service.src.db.elastic import ElasticsearchRepository
+from fastapi_service.src.db.redis import redis_cache
+from fastapi_service.src.db.search_repository import source_fields
 from fastapi_service.src.models.genre import Genre
+from fastapi_service.src.services.genre_catalogue import GenreCatalogue
+from fastapi_service.src.utils.serialization import from_hits, from_source
+
+GENRE_FIELDS = source_fields(Genre)
+# ``name`` is analyzed, so partial matches such as "Action & Adventure" for
+# "Action" also hit. Exact names are picked from the hits, so every name gets
+# room for a few partial matches that must not push it out of the results.
+GENRE_HITS_PER_NAME = 5
+
 
+def _genres_tags(genres: list[Genre]) -> list[str]:
+    return [f"genre:{genre.id}" for genre in genres]
 
+
+@elastic_callers
+@traced_methods
 class GenreService:
-    def __init__(self, redis: Redis, elastic: ElasticsearchRepository):
+    def __init__(
+            self,
+            redis: Redis,
+            elastic: ElasticsearchRepository,
+            catalogue: GenreCatalogue | None = None,
+    ):
         self.redis = redis
         self.elastic = elastic
+        self.catalogue = catalogue
         self.index = config.ELASTIC_GENRE_INDEX
 
+    @property
+    def use_catalogue(self) -> bool:
+        return self.catalogue is not None and self.catalogue.is_loaded
+
     async def get_by_name(self, genre_name: str) -> Genre:
-        es_query = {"query": {"match": {"name": genre_name}}}
+        genres = await self.get_by_names([genre_name])
+        if genres:
+            return genres[0]
+
+    async def get_by_names(self, genre_names: list[str]) -> list[Genre]:
+        if not genre_names:
+            return []
+        if self.use_catalogue:
+            return self.catalogue.get_by_names(genre_names)
+        es_query = {
+            "query": {
+                "bool": {
+                    "should": [
+                        {"match_phrase": {"name": genre_name}}
+                        for genre_name in genre_names
+                    ],
+                    "minimum_should_match": 1,
+                }
+            },
+            "_source": GENRE_FIELDS,
+            "size": len(genre_names) * GENRE_HITS_PER_NAME,
+        }
         try:
             hits = await self.elastic.search(body=es_query)
-            if len(genre_data := hits) > 0:
-                return Genre(**genre_data[0]["_source"])
         except NotFoundError:
-            logger.exception("'%s' genre wasn't found", genre_name)
+            logger.exception("Genres %s weren't found", genre_names)
+            return []
+        genres_by_name = {
+            hit["_source"]["name"].lower(): from_source(
+                Genre, hit["_source"]
+            )
+            for hit in hits
+        }
+        genres = []
+        for genre_name in genre_names:
+            genre = genres_by_name.get(genre_name.lower())
+            if genre:
+                genres.append(genre)
+            else:
+                logger.warning("'%s' genre wasn't found", genre_name)
+        return genres
 
     async def get_genres(self) -> list[Genre]:
-        es_query = {"query": {"match_all": {}}}
+        if self.use_catalogue:
+            return self.catalogue.get_genres()
+        return await self._get_genres()
+
+    @redis_cache("genre_list", Genre, tags=_genres_tags)
+    async def _get_genres(self) -> list[Genre]:
+        es_query = {"query": {"match_all": {}}, "_source": GENRE_FIELDS}
         hits = await self.elastic.search(body=es_query)
-        genres = [Genre(**hit["_source"]) for hit in hits]
+        genres = from_hits(Genre, hits)
         return genres
 
-    @redis_cache("genre", Genre)
     async def get_by_id(self, genre_id: str) -> Genre:
-        genre_data = await self.elastic.get(doc_id=genre_id)
+        if self.use_catalogue:
+            return self.catalogue.get_by_id(genre_id)
+        return await self._get_by_id(genre_id)
+
+    @redis_cache("genre", Genre)
+    async def _get_by_id(self, genre_id: str) -> Genre:
+        genre_data = await self.elastic.get(
+            doc_id=genre_id, source=GENRE_FIELDS
+        )
         if genre_data:
-            return Genre(**genre_data)
+            return from_source(Genre, genre_data)
 
 
-@lru_cache()
-def get_genre_service(
-        redis: Redis = Depends(get_redis),
-        elastic: AsyncElasticsearch = Depends(get_elastic),
-) -> GenreService:
-    return GenreService(
-        redis, ElasticsearchRepository(elastic, config.ELASTIC_GENRE_INDEX)
-    )
+async def get_genre_service(request: Request) -> GenreService:
+    return request.app.state.genre_service
@@ -0,0 +1,96 @@
+import asyncio
+import contextlib
+
+from fastapi_service.src.core.logger import logger
+from fastapi_service.src.core.metrics import elastic_callers
+from fastapi_service.src.db.search_repository import (
+    SearchRepository,
+    source_fields,
+)
+from fastapi_service.src.models.genre import Genre
+from fastapi_service.src.utils.serialization import from_hits
+
+
+@elastic_callers
+class GenreCatalogue:
+    """In-process copy of the genres index with id and name lookups.
+
+    The index is loaded once at startup and then reloaded every
+    ``refresh_interval`` seconds, so lookups never leave the process.
+    """
+
+    def __init__(
+            self,
+            elastic: SearchRepository,
+            refresh_interval: int,
+            size: int,
+    ):
+        self.elastic = elastic
+        self.refresh_interval = refresh_interval
+        self.size = size
+        self.is_loaded = False
+        self._genres: list[Genre] = []
+        self._by_id: dict[str, Genre] = {}
+        self._by_name: dict[str, Genre] = {}
+        self._refresh_task: asyncio.Task | None = None
+
+    async def load(self) -> None:
+        es_query = {
+            "query": {"match_all": {}},
+            "_source": source_fields(Genre),
+            "size": self.size,
+        }
+        hits = await self.elastic.search(body=es_query)
+        genres = from_hits(Genre, hits)
+        self._genres = genres
+        self._by_id = {str(genre.id): genre for genre in genres}
+        self._by_name = {genre.name.lower(): genre for genre in genres}
+        self.is_loaded = True
+        logger.info("Genre catalogue loaded %d genres", len(genres))
+
+    async def start(self) -> None:
+        try:
+            await self.load()
+        except Exception:  # noqa
+            logger.exception("Failed to load the genre catalogue")
+        self._refresh_task = asyncio.create_task(self._refresh())
+
+    async def stop(self) -> None:
+        if self._refresh_task:
+            self._refresh_task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._refresh_task
+            self._refresh_task = None
+
+    async def _refresh(self) -> None:
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            try:
+                await self.load()
+            except Exception:  # noqa
+                logger.exception("Failed to refresh the genre catalogue")
+
+    async def handle_tags(self, tags: list[str]) -> None:
+        """Reloads the catalogue when a genre has changed."""
+        if not any(tag.startswith("genre:") for tag in tags):
+            return
+        try:
+            await self.load()
+        except Exception:  # noqa
+            logger.exception("Failed to reload the genre catalogue")
+
+    def get_genres(self) -> list[Genre]:
+        return list(self._genres)
+
+    def get_by_id(self, genre_id: str) -> Genre | None:
+        return self._by_id.get(genre_id)
+
+    def get_by_names(self, genre_names: list[str]) -> list[Genre]:
+        genres = []
+        for genre_name in genre_names:
+            genre = self._by_name.get(genre_name.lower())
+            if genre:
+                genres.append(genre)
+            else:
+                logger.warning("'%s' genre wasn't found", genre_name)
+        return genres
@@ -1,20 +1,47 @@
-from functools import lru_cache
+import asyncio
 
-from elasticsearch import AsyncElasticsearch
-from fastapi import Depends
+from fastapi import Request
 from redis.asyncio import Redis
 
 from fastapi_service.src.core import config
-from fastapi_service.src.db.elastic import (
-    get_elastic,
-    ElasticsearchRepository,
-)
-from fastapi_service.src.db.redis import get_redis, redis_cache
+from fastapi_service.src.core.metrics import elastic_callers
+from fastapi_service.src.core.tracing import traced_methods
+from fastapi_service.src.db.elastic import ElasticsearchRepository
+from fastapi_service.src.db.query_templates import Param, QueryTemplate
+from fastapi_service.src.db.redis import redis_cache
+from fastapi_service.src.db.search_repository import source_fields
 from fastapi_service.src.models.film import Film
-from fastapi_service.src.models.person import PersonWithFilms
-from fastapi_service.src.services.film import FilmService, get_film_service
+from fastapi_service.src.models.person import Person, PersonWithFilms
+from fastapi_service.src.services.film import FilmService
+from fastapi_service.src.utils.concurrency import gather
+from fastapi_service.src.utils.serialization import from_hits, from_source
+
+# Films come from the films index, so only the person's own fields are read.
+PERSON_FIELDS = source_fields(Person)
+PERSON_SEARCH_QUERY = QueryTemplate(
+    {
+        "query": {"match": {"name": Param("query")}},
+        "_source": PERSON_FIELDS,
+        "from": Param("offset"),
+        "size": Param("size"),
+    }
+)
+
+
+def _person_tags(person: PersonWithFilms) -> list[str]:
+    return [f"film:{film.id}" for film in person.films or []]
 
 
+def _persons_tags(persons: list[PersonWithFilms]) -> list[str]:
+    return [
+        tag
+        for person in persons
+        for tag in (f"person:{person.id}", *_person_tags(person))
+    ]
+
+
+@elastic_callers
+@traced_methods
 class PersonService:
     def __init__(
             self,
@@ -26,51 +53,81 @@ class PersonService:
         self.elastic = elastic
         self.film_service = film_service
         self.index = config.ELASTIC_PERSON_INDEX
+        # Shared by all requests, so it bounds their backend calls together.
+        self.limiter = asyncio.Semaphore(config.SERVICE_CONCURRENCY_LIMIT)
 
+    @redis_cache(
+        "person_search",
+        PersonWithFilms,
+        local_ttl=config.LOCAL_CACHE_TTL,
+        tags=_persons_tags,
+    )
     async def search(
             self, query: str, page_number: int, page_size: int
     ) -> list[PersonWithFilms]:
+        es_query = PERSON_SEARCH_QUERY.render(
+            query=query, offset=(page_number - 1) * page_size, size=page_size
+        )
+        hits = await self.elastic.search(body=es_query)
+        return await self._with_films(hits)
+
+    async def search_page(
+            self, query: str, cursor: str | None, page_size: int
+    ) -> tuple[list[PersonWithFilms], str | None]:
         es_query = {
+            **self._search_query(query),
+            "sort": ["_score"],
+            "size": page_size,
+        }
+        hits, next_cursor = await self.elastic.search_after(es_query, cursor)
+        return await self._with_films(hits), next_cursor
+
+    @staticmethod
+    def _search_query(query: str) -> dict:
+        return {
             "query": {
                 "match": {
                     "name": query,
                 }
             },
-            "from": (page_number - 1) * page_size,
-            "size": page_size,
+            "_source": PERSON_FIELDS,
         }
-        hits = await self.elastic.search(body=es_query)
-        persons = [PersonWithFilms(**hit["_source"]) for hit in hits]
+
+    async def _with_films(self, hits: list[dict]) -> list[PersonWithFilms]:
+        persons = from_hits(PersonWithFilms, hits)
+        person_film_works = await self.film_service.get_by_person_ids(
+            [str(person.id) for person in persons]
+        )
         for person in persons:
-            person_film_works = await self.film_service.get_by_person_name(
-                person.name
-            )
-            person.films = person_film_works
+            person.films = person_film_works[str(person.id)]
         return persons
 
-    @redis_cache("person", PersonWithFilms)
+    @redis_cache(
+        "person",
+        PersonWithFilms,
+        local_ttl=config.LOCAL_CACHE_TTL,
+        tags=_person_tags,
+    )
     async def get_by_id(self, person_id: str) -> PersonWithFilms:
-        person_data = await self.elastic.get(doc_id=person_id)
+        person_data, person_film_works = await gather(
+            self.elastic.get(doc_id=person_id, source=PERSON_FIELDS),
+            self.film_service.get_by_person_ids([person_id]),
+            limiter=self.limiter,
+            timeout=config.SERVICE_IO_TIMEOUT,
+        )
         if person_data:
-            person = PersonWithFilms(**person_data)
-            person.films = await self.film_service.get_by_person_name(
-                person.name
-            )
+            person = from_source(PersonWithFilms, person_data)
+            person.films = person_film_works[person_id]
             return person
 
-    @redis_cache("pfw", Film)
     async def get_film_works_by_person_id(self, person_id: str) -> list[Film]:
-        return await self.film_service.get_by_person_id(person_id)
-
-
-@lru_cache()
-def get_person_service(
-        redis: Redis = Depends(get_redis),
-        elastic: AsyncElasticsearch = Depends(get_elastic),
-        film_service: FilmService = Depends(get_film_service),
-) -> PersonService:
-    return PersonService(
-        redis,
-        ElasticsearchRepository(elastic, config.ELASTIC_PERSON_INDEX),
-        film_service,
-    )
+        person_film_works = await self.film_service.get_by_person_ids(
+            [person_id]
+        )
+        return await self.film_service.get_many(
+            [str(film.id) for film in person_film_works[person_id]]
+        )
+
+
+async def get_person_service(request: Request) -> PersonService:
+    return request.app.state.person_service
@@ -0,0 +1,30 @@
+import asyncio
+from typing import Any, Awaitable
+
+
+async def gather(
+        *aws: Awaitable[Any],
+        limiter: asyncio.Semaphore | None = None,
+        timeout: float | None = None,
+) -> list[Any]:
+    """Awaits independent calls concurrently and returns results in order.
+
+    The calls run in one TaskGroup: the first failure cancels the others
+    and is raised as is, and so does the whole group on ``timeout`` or when
+    the caller is cancelled. A ``limiter`` shared by the callers bounds how
+    many of their calls run at once across all of them.
+    """
+
+    async def run(aw: Awaitable[Any]) -> Any:
+        if limiter is None:
+            return await aw
+        async with limiter:
+            return await aw
+
+    try:
+        async with asyncio.timeout(timeout):
+            async with asyncio.TaskGroup() as group:
+                tasks = [group.create_task(run(aw)) for aw in aws]
+    except BaseExceptionGroup as errors:
+        raise errors.exceptions[0] from None
+    return [task.result() for task in tasks]
@@ -1,6 +1,17 @@
-from typing import Annotated
+import base64
+import binascii
+import json
+from http import HTTPStatus
+from typing import Annotated, Any, Awaitable
 
-from fastapi import Query
+from fastapi import HTTPException, Query
+
+from fastapi_service.src.utils.response import RawJSONResponse
+from fastapi_service.src.utils.serialization import dump_json
+
+
+class CursorError(ValueError):
+    pass
 
 
 class Pagination:
@@ -8,6 +19,67 @@ class Pagination:
             self,
             page_number: Annotated[int, Query(ge=1)] = 1,
             page_size: Annotated[int, Query(ge=1)] = 50,
+            cursor: Annotated[
+                str | None,
+                Query(
+                    description=(
+                        "Cursor pagination: pass an empty value for the "
+                        "first page and then the X-Next-Cursor header of "
+                        "the previous response. page_number is ignored."
+                    )
+                ),
+            ] = None,
     ):
         self.page_number = page_number
         self.page_size = page_size
+        self.cursor = cursor
+
+
+def encode_cursor(pit_id: str, search_after: list) -> str:
+    state = json.dumps({"pit": pit_id, "after": search_after})
+    return base64.urlsafe_b64encode(state.encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> tuple[str, list]:
+    try:
+        state = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        pit_id, search_after = state["pit"], state["after"]
+    except (
+            binascii.Error,
+            UnicodeError,
+            json.JSONDecodeError,
+            TypeError,
+            KeyError,
+    ) as exc:
+        raise CursorError("Invalid cursor") from exc
+    if not (
+            isinstance(pit_id, str)
+            and pit_id
+            and isinstance(search_after, list)
+            and all(
+                isinstance(value, (str, int, float)) or value is None
+                for value in search_after
+            )
+    ):
+        raise CursorError("Invalid cursor")
+    return pit_id, search_after
+
+
+async def fetch_page(
+        page: Awaitable[tuple[list, str | None]]
+) -> tuple[list, str | None]:
+    """Awaits a cursor page, answering 400 to a bad or expired cursor."""
+    try:
+        return await page
+    except CursorError as exc:
+        raise HTTPException(
+            status_code=HTTPStatus.BAD_REQUEST, detail=str(exc)
+        )
+
+
+def page_response(
+        items: list, next_cursor: str | None, model: Any
+) -> RawJSONResponse:
+    """Responds with a cursor page, its next cursor in a header."""
+    headers = {"X-Next-Cursor": next_cursor} if next_cursor else None
+    return RawJSONResponse(dump_json(items, model), headers=headers)
@@ -0,0 +1,15 @@
+from fastapi.responses import JSONResponse, ORJSONResponse, Response
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class RawJSONResponse(Response):
+    """Sends an already serialized JSON body as is."""
+
+    media_type = "application/json"
+
+
+DefaultJSONResponse = ORJSONResponse if orjson else JSONResponse
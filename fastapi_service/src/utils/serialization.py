@@ -0,0 +1,62 @@
+from functools import lru_cache
+from typing import Any, Iterable, TypeVar, get_args
+
+from pydantic import BaseModel, TypeAdapter
+
+from fastapi_service.src.core import config
+
+M = TypeVar("M", bound=BaseModel)
+
+
+@lru_cache()
+def list_adapter(model: Any) -> TypeAdapter:
+    return TypeAdapter(list[model])
+
+
+def _holds_model(annotation: Any) -> bool:
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return True
+    return any(_holds_model(arg) for arg in get_args(annotation))
+
+
+@lru_cache()
+def _nested_keys(model: type[BaseModel]) -> frozenset[str]:
+    """Names and aliases of the fields that hold other models."""
+    keys = set()
+    for name, field in model.model_fields.items():
+        if _holds_model(field.annotation):
+            keys.update(filter(None, (name, field.alias)))
+    return frozenset(keys)
+
+
+def from_source(model: type[M], source: dict) -> M:
+    """Builds ``model`` from an Elasticsearch ``_source``.
+
+    The indices are written by the ETL against the same schema, so with
+    ``ELASTIC_TRUSTED_SOURCE`` flat documents skip validation. Documents
+    with nested models are still validated, as constructing them would
+    leave plain dicts that serialize under the wrong keys.
+    """
+    if config.ELASTIC_TRUSTED_SOURCE and _nested_keys(model).isdisjoint(
+            source
+    ):
+        return model.model_construct(**source)
+    return model(**source)
+
+
+def from_hits(model: type[M], hits: Iterable[dict]) -> list[M]:
+    return [from_source(model, hit["_source"]) for hit in hits]
+
+
+def dump_json(result: Any, model: Any) -> bytes:
+    """Serializes a model or a list of models the way the API responds.
+
+    Trusted models may hold ids as strings, so type warnings are muted.
+    """
+    if isinstance(result, list):
+        return list_adapter(model).dump_json(
+            result, by_alias=True, warnings=False
+        )
+    return result.model_dump_json(by_alias=True, warnings=False).encode(
+        "utf-8"
+    )
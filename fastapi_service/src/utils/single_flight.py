@@ -0,0 +1,33 @@
+import asyncio
+from typing import Any, Awaitable, Callable
+
+
+class SingleFlight:
+    """Deduplicates concurrent calls that share a key.
+
+    The first caller starts the call in a task and every caller that arrives
+    while it is running awaits the same task. Cancelling one of the callers
+    doesn't cancel the call for the others.
+    """
+
+    def __init__(self):
+        self._calls: dict[str, asyncio.Task] = {}
+
+    async def do(self, key: str, func: Callable[[], Awaitable[Any]]) -> Any:
+        return await asyncio.shield(self.start(key, func))
+
+    def start(
+            self, key: str, func: Callable[[], Awaitable[Any]]
+    ) -> asyncio.Task:
+        call = self._calls.get(key)
+        if call is None:
+            call = asyncio.ensure_future(func())
+            self._calls[key] = call
+            call.add_done_callback(lambda task: self._forget(key, task))
+        return call
+
+    def _forget(self, key: str, task: asyncio.Task) -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        if not task.cancelled():
+            task.exception()
@@ -0,0 +1,60 @@
+import asyncio
+import random
+from typing import Callable, Generator
+
+import pytest
+
+from fastapi_service.src.services.film import FilmService
+from fastapi_service.src.services.genre import GenreService
+from fastapi_service.src.services.person import PersonService
+from tests.benchmark.utils.fakes import FakeRedis, InMemorySearchRepository
+from tests.benchmark.utils.seed import generate_film_docs, generate_person_docs
+from tests.functional.utils.random_helper import generate_genres
+
+
+@pytest.fixture(autouse=True)
+def flush_cache():
+    """Overrides the Redis flush, the benchmarks run without services."""
+
+
+@pytest.fixture
+def run_async() -> Generator[Callable, None, None]:
+    """Runs a coroutine to completion, once per benchmark round."""
+    loop = asyncio.new_event_loop()
+    yield lambda coro_factory: loop.run_until_complete(coro_factory())
+    loop.close()
+
+
+@pytest.fixture(scope="session")
+def dataset() -> dict[str, list[dict]]:
+    rng = random.Random(0)
+    genres = generate_genres(20)
+    persons = generate_person_docs(200, rng)
+    films = list(generate_film_docs(1000, genres, persons, rng))
+    return {"genres": genres, "persons": persons, "films": films}
+
+
+@pytest.fixture
+def fake_redis() -> FakeRedis:
+    return FakeRedis()
+
+
+@pytest.fixture
+def genre_service(fake_redis, dataset) -> GenreService:
+    return GenreService(
+        fake_redis, InMemorySearchRepository(dataset["genres"]), None
+    )
+
+
+@pytest.fixture
+def film_service(fake_redis, dataset, genre_service) -> FilmService:
+    return FilmService(
+        fake_redis, InMemorySearchRepository(dataset["films"]), genre_service
+    )
+
+
+@pytest.fixture
+def person_service(fake_redis, dataset, film_service) -> PersonService:
+    return PersonService(
+        fake_redis, InMemorySearchRepository(dataset["persons"]), film_service
+    )
@@ -0,0 +1,299 @@
+"""Replays a traffic mix against the running API and checks for regressions.
+
+Usage: python -m tests.benchmark.load_test [--seed --films 10000]
+       [--requests 2000] [--concurrency 20] [--save-baseline]
+
+The API, Elasticsearch and Redis are the ones of ``tests.settings``, e.g.
+the services of tests/docker-compose.yml. ``--seed`` first fills the indices
+with generated data. The requests of traffic.jsonl are drawn by weight, and
+their ``{placeholders}`` are filled with documents sampled from the
+indices. The same requests run twice: cold, after flushing Redis, and
+warm. The API's in-process caches survive the flush, so a cold run right
+after a restart is the only truly cold one.
+
+Latencies are compared with the baseline file and the run fails when p95,
+p99, throughput or errors get worse by more than ``--tolerance``.
+"""
+import argparse
+import asyncio
+import json
+import math
+import random
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+from urllib.parse import urljoin
+
+import aiohttp
+from elasticsearch import AsyncElasticsearch
+from redis.asyncio import Redis
+
+from tests.benchmark.utils.seed import seed
+from tests.settings import test_settings
+
+BENCHMARK_DIR = Path(__file__).parent
+TOTAL = "total"
+
+
+def load_traffic(path: Path) -> list[dict]:
+    with open(path) as file:
+        return [json.loads(line) for line in file if line.strip()]
+
+
+async def load_samples(
+        es_client: AsyncElasticsearch, size: int, rng: random.Random
+) -> dict[str, list]:
+    """Values for the placeholders of the traffic, from random documents."""
+
+    async def sample(index_mapping: dict) -> list[dict]:
+        response = await es_client.search(
+            index=index_mapping["index_name"],
+            query={
+                "function_score": {
+                    "random_score": {
+                        "seed": rng.randrange(2 ** 31),
+                        "field": "_seq_no",
+                    }
+                }
+            },
+            size=size,
+        )
+        return [hit["_source"] for hit in response["hits"]["hits"]]
+
+    films = await sample(test_settings.es_film_mapping)
+    persons = await sample(test_settings.es_person_mapping)
+    genres = await sample(test_settings.es_genre_mapping)
+    samples = {
+        "film_id": [film["id"] for film in films],
+        "film_query": [film["title"].split()[0] for film in films],
+        "person_id": [person["id"] for person in persons],
+        "person_query": [person["name"].split()[-1] for person in persons],
+        "genre_id": [genre["id"] for genre in genres],
+        "page_number": list(range(1, 6)),
+    }
+    empty = [key for key, values in samples.items() if not values]
+    if empty:
+        raise SystemExit(f"No documents to sample {empty} from, use --seed")
+    return samples
+
+
+def plan_requests(
+        traffic: list[dict],
+        samples: dict[str, list],
+        count: int,
+        rng: random.Random,
+) -> list[tuple[str, str, dict]]:
+    entries = rng.choices(
+        traffic, weights=[entry["weight"] for entry in traffic], k=count
+    )
+    planned = []
+    for entry in entries:
+        values = {key: rng.choice(options) for key, options in samples.items()}
+        params = {
+            key: str(value).format(**values)
+            for key, value in entry.get("params", {}).items()
+        }
+        planned.append((entry["name"], entry["path"].format(**values), params))
+    return planned
+
+
+def percentile(ordered: list[float], q: float) -> float:
+    """The nearest-rank percentile of sorted values."""
+    return ordered[max(0, math.ceil(q / 100 * len(ordered)) - 1)]
+
+
+def summarize(
+        latencies: list[float], errors: int, elapsed: float
+) -> dict[str, float]:
+    ordered = sorted(latencies)
+    return {
+        "requests": len(ordered),
+        "errors": errors,
+        "rps": round(len(ordered) / elapsed, 1),
+        **{
+            f"p{q}": round(percentile(ordered, q) * 1000, 2)
+            for q in (50, 95, 99)
+        },
+    }
+
+
+async def run_phase(
+        session: aiohttp.ClientSession,
+        planned: list[tuple[str, str, dict]],
+        concurrency: int,
+) -> dict[str, dict]:
+    latencies = defaultdict(list)
+    errors = defaultdict(int)
+    requests = iter(planned)
+
+    async def worker() -> None:
+        for name, path, params in requests:
+            started = time.perf_counter()
+            try:
+                async with session.get(
+                        urljoin(test_settings.service_url, path), params=params
+                ) as response:
+                    await response.read()
+                    # Not found is a valid answer for sampled ids and queries.
+                    failed = response.status >= 500
+            except aiohttp.ClientError:
+                failed = True
+            latencies[name].append(time.perf_counter() - started)
+            errors[name] += failed
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    summary = {
+        TOTAL: summarize(
+            [latency for values in latencies.values() for latency in values],
+            sum(errors.values()),
+            elapsed,
+        )
+    }
+    for name in sorted(latencies):
+        summary[name] = summarize(latencies[name], errors[name], elapsed)
+    return summary
+
+
+def compare(
+        results: dict[str, dict],
+        baseline: dict[str, dict],
+        tolerance: float,
+        min_delta_ms: float,
+) -> list[str]:
+    """Lists what got worse than the baseline by more than ``tolerance``.
+
+    Latencies also have to grow by ``min_delta_ms``, so that noise on
+    sub-millisecond endpoints doesn't fail the run.
+    """
+    regressions = []
+    for phase, expected_groups in baseline.items():
+        for name, expected in expected_groups.items():
+            actual = results.get(phase, {}).get(name)
+            if actual is None:
+                continue
+            label = f"{phase} {name}"
+            for metric in ("p95", "p99"):
+                if (
+                        actual[metric] > expected[metric] * (1 + tolerance)
+                        and actual[metric] - expected[metric] > min_delta_ms
+                ):
+                    regressions.append(
+                        f"{label} {metric}: {actual[metric]} ms, "
+                        f"baseline {expected[metric]} ms"
+                    )
+            if name == TOTAL and actual["rps"] < expected["rps"] * (
+                    1 - tolerance
+            ):
+                regressions.append(
+                    f"{label} throughput: {actual['rps']} rps, "
+                    f"baseline {expected['rps']} rps"
+                )
+            if actual["errors"] > expected["errors"]:
+                regressions.append(
+                    f"{label} errors: {actual['errors']}, "
+                    f"baseline {expected['errors']}"
+                )
+    return regressions
+
+
+def report(results: dict[str, dict]) -> None:
+    for phase, groups in results.items():
+        print(f"\n{phase}")
+        print(
+            f"{'endpoint':>16} {'requests':>9} {'errors':>7} {'rps':>8} "
+            f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}"
+        )
+        for name, stats in groups.items():
+            print(
+                f"{name:>16} {stats['requests']:9d} {stats['errors']:7d} "
+                f"{stats['rps']:8.1f} {stats['p50']:8.2f} "
+                f"{stats['p95']:8.2f} {stats['p99']:8.2f}"
+            )
+
+
+async def main(args: argparse.Namespace) -> None:
+    if not (args.save_baseline or args.baseline.exists()):
+        raise SystemExit(
+            f"No baseline at {args.baseline}, use --save-baseline"
+        )
+    rng = random.Random(args.random_seed)
+    es_client = AsyncElasticsearch(
+        hosts=[
+            f"{test_settings.es_schema}://{test_settings.es_host}:"
+            f"{test_settings.es_port}"
+        ]
+    )
+    try:
+        if args.seed:
+            await seed(
+                es_client,
+                films_count=args.films,
+                persons_count=args.persons or max(args.films // 10, 1),
+                genres_count=args.genres,
+                rng=rng,
+            )
+        samples = await load_samples(es_client, args.sample, rng)
+    finally:
+        await es_client.close()
+
+    planned = plan_requests(
+        load_traffic(args.traffic), samples, args.requests, rng
+    )
+    results = {}
+    async with Redis(
+            host=test_settings.redis_host, port=test_settings.redis_port
+    ) as redis, aiohttp.ClientSession() as session:
+        await redis.flushdb()
+        results["cold"] = await run_phase(session, planned, args.concurrency)
+        results["warm"] = await run_phase(session, planned, args.concurrency)
+    report(results)
+
+    if args.save_baseline:
+        args.baseline.write_text(json.dumps(results, indent=2) + "\n")
+        print(f"\nSaved the baseline to {args.baseline}")
+        return
+    regressions = compare(
+        results,
+        json.loads(args.baseline.read_text()),
+        args.tolerance,
+        args.min_delta_ms,
+    )
+    if regressions:
+        print("\nRegressions against the baseline:")
+        print("\n".join(f"  {regression}" for regression in regressions))
+        sys.exit(1)
+    print("\nNo regressions against the baseline")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--seed", action="store_true",
+        help="recreate the indices with generated data first",
+    )
+    parser.add_argument("--films", type=int, default=10000)
+    parser.add_argument(
+        "--persons", type=int, default=0, help="a tenth of --films by default"
+    )
+    parser.add_argument("--genres", type=int, default=30)
+    parser.add_argument(
+        "--traffic", type=Path, default=BENCHMARK_DIR / "traffic.jsonl"
+    )
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument(
+        "--sample", type=int, default=1000,
+        help="documents per index to fill the placeholders from",
+    )
+    parser.add_argument(
+        "--baseline", type=Path, default=BENCHMARK_DIR / "baseline.json"
+    )
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    parser.add_argument("--min-delta-ms", type=float, default=2.0)
+    parser.add_argument("--random-seed", type=int, default=0)
+    asyncio.run(main(parser.parse_args()))
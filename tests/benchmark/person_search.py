@@ -0,0 +1,95 @@
+"""Compares the per-person and the batched film lookup of person search.
+
+Usage: python -m tests.benchmark.person_search [--persons 50] [--films 2000]
+"""
+import argparse
+import asyncio
+import random
+import time
+
+from fastapi_service.src.models.person import PersonWithFilms
+from fastapi_service.src.services.film import FilmService
+from fastapi_service.src.services.person import PersonService
+from tests.benchmark.utils.fakes import InMemorySearchRepository
+from tests.functional.utils.random_helper import (
+    generate_films,
+    generate_persons,
+)
+
+
+# The benchmark measures Elasticsearch round trips, so the cache is bypassed.
+search = PersonService.search.__wrapped__
+
+
+def build_data(persons_count: int, films_count: int) -> tuple[list, list]:
+    persons = generate_persons(persons_count)
+    films = generate_films(films_count)
+    for film in films:
+        film["actors"] = random.sample(persons, k=min(3, len(persons)))
+        film["directors"] = random.sample(persons, k=1)
+    return persons, films
+
+
+async def search_per_person(
+        person_service: PersonService, query: str, page_size: int
+):
+    es_query = {"query": {"match": {"name": query}}, "size": page_size}
+    hits = await person_service.elastic.search(body=es_query)
+    persons = [PersonWithFilms(**hit["_source"]) for hit in hits]
+    for person in persons:
+        person.films = await person_service.film_service.get_by_person_name(
+            person.name
+        )
+    return persons
+
+
+async def measure(coro_factory, repositories: list, repeat: int) -> tuple:
+    for repository in repositories:
+        repository.calls = 0
+    started = time.perf_counter()
+    for _ in range(repeat):
+        await coro_factory()
+    elapsed = (time.perf_counter() - started) / repeat
+    calls = sum(repository.calls for repository in repositories) / repeat
+    return calls, elapsed
+
+
+async def main(args: argparse.Namespace) -> None:
+    persons, films = build_data(args.persons, args.films)
+    person_repository = InMemorySearchRepository(persons, args.latency)
+    film_repository = InMemorySearchRepository(films, args.latency)
+    film_service = FilmService(None, film_repository, None)
+    # Without the precomputed person_films hash the lookup queries the index.
+    film_service.get_by_person_ids = film_service._search_by_person_ids
+    person_service = PersonService(None, person_repository, film_service)
+    repositories = [person_repository, film_repository]
+    # Every generated person matches the query, so a page is always full.
+    query = " ".join({person["name"] for person in persons})
+
+    per_person = await measure(
+        lambda: search_per_person(person_service, query, args.persons),
+        repositories,
+        args.repeat,
+    )
+    batched = await measure(
+        lambda: search(person_service, query, 1, args.persons),
+        repositories,
+        args.repeat,
+    )
+    for name, (calls, elapsed) in (
+            ("per person", per_person),
+            ("batched", batched),
+    ):
+        print(f"{name:>10}: {calls:5.0f} ES calls, {elapsed * 1000:8.2f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--persons", type=int, default=50)
+    parser.add_argument("--films", type=int, default=2000)
+    parser.add_argument(
+        "--latency", type=float, default=0.002,
+        help="simulated Elasticsearch round trip, seconds",
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,79 @@
+import pytest
+
+from fastapi_service.src.jobs.person_films import PersonFilmsJob
+from fastapi_service.src.services.film import FilmService
+
+# The cache is bypassed, so every round runs the service code.
+get_by_id = FilmService.get_by_id.__wrapped__
+search = FilmService.search.__wrapped__
+get_films = FilmService.get_films.__wrapped__
+
+
+class TestFilmService:
+
+    def test_get_by_id(self, benchmark, run_async, film_service, dataset):
+        film = dataset["films"][0]
+
+        result = benchmark(
+            run_async, lambda: get_by_id(film_service, film["id"])
+        )
+
+        assert str(result.id) == film["id"]
+        assert result.genres
+
+    def test_search(self, benchmark, run_async, film_service, dataset):
+        title = dataset["films"][0]["title"]
+
+        result = benchmark(
+            run_async, lambda: search(film_service, title, 1, 50)
+        )
+
+        assert result
+
+    def test_get_films_by_genre(
+            self, benchmark, run_async, film_service, genre_service
+    ):
+        genre = run_async(genre_service.get_genres)[0]
+
+        result = benchmark(
+            run_async,
+            lambda: get_films(
+                film_service, "-imdb_rating", 1, 50, genre_id=str(genre.id)
+            ),
+        )
+
+        assert result
+
+    def test_get_by_person_name(
+            self, benchmark, run_async, film_service, dataset
+    ):
+        person = dataset["films"][0]["actors"][0]
+
+        result = benchmark(
+            run_async, lambda: film_service.get_by_person_name(person["name"])
+        )
+
+        assert any("actor" in film_work.roles for film_work in result)
+
+    @pytest.mark.parametrize("precomputed", [False, True])
+    def test_get_by_person_ids(
+            self,
+            benchmark,
+            run_async,
+            film_service,
+            fake_redis,
+            dataset,
+            precomputed,
+    ):
+        if precomputed:
+            job = PersonFilmsJob(
+                fake_redis, film_service.elastic, batch_size=1000
+            )
+            run_async(job.rebuild)
+        person_ids = [person["id"] for person in dataset["persons"][:50]]
+
+        result = benchmark(
+            run_async, lambda: film_service.get_by_person_ids(person_ids)
+        )
+
+        assert any(result.values())
@@ -0,0 +1,22 @@
+from fastapi_service.src.services.genre import GenreService
+
+get_genres = GenreService._get_genres.__wrapped__
+
+
+class TestGenreService:
+
+    def test_get_genres(self, benchmark, run_async, genre_service):
+        result = benchmark(run_async, lambda: get_genres(genre_service))
+
+        assert result
+
+    def test_get_by_names(
+            self, benchmark, run_async, genre_service, dataset
+    ):
+        names = [genre["name"] for genre in dataset["genres"][:5]]
+
+        result = benchmark(
+            run_async, lambda: genre_service.get_by_names(names)
+        )
+
+        assert result
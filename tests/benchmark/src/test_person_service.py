@@ -0,0 +1,25 @@
+from fastapi_service.src.services.person import PersonService
+
+search = PersonService.search.__wrapped__
+get_by_id = PersonService.get_by_id.__wrapped__
+
+
+class TestPersonService:
+
+    def test_search(self, benchmark, run_async, person_service, dataset):
+        name = dataset["persons"][0]["name"]
+
+        result = benchmark(
+            run_async, lambda: search(person_service, name, 1, 50)
+        )
+
+        assert result
+
+    def test_get_by_id(self, benchmark, run_async, person_service, dataset):
+        person = dataset["films"][0]["directors"][0]
+
+        result = benchmark(
+            run_async, lambda: get_by_id(person_service, person["id"])
+        )
+
+        assert result.films
@@ -0,0 +1,84 @@
+import pytest
+
+from fastapi_service.src.db.redis import redis_cache, redis_cache_many
+from fastapi_service.src.models.film import Film, FilmDetails
+from fastapi_service.src.utils.serialization import from_source
+
+
+class CachedFilms:
+    """A service whose methods only return prebuilt films, so the
+    benchmarks measure the cache itself."""
+
+    def __init__(self, redis, films: list[Film], details: list[FilmDetails]):
+        self.redis = redis
+        self.films = films
+        self.details = {str(film.id): film for film in details}
+
+    @redis_cache("bench_list", Film)
+    async def get_list(self, page_number: int) -> list[Film]:
+        return self.films
+
+    @redis_cache("bench_local_list", Film, local_ttl=60)
+    async def get_local_list(self, page_number: int) -> list[Film]:
+        return self.films
+
+    @redis_cache_many("bench_film", FilmDetails)
+    async def get_many(self, film_ids: list[str]) -> list[FilmDetails]:
+        return [self.details[film_id] for film_id in film_ids]
+
+
+@pytest.fixture
+def cached_films(fake_redis, dataset) -> CachedFilms:
+    docs = dataset["films"][:50]
+    details = [
+        FilmDetails(**{**doc, "genres": []}) for doc in docs
+    ]
+    return CachedFilms(
+        fake_redis, [from_source(Film, doc) for doc in docs], details
+    )
+
+
+class TestRedisCache:
+
+    def test_miss(self, benchmark, run_async, cached_films, fake_redis):
+        result = benchmark.pedantic(
+            run_async,
+            args=(lambda: cached_films.get_list(1),),
+            setup=fake_redis.data.clear,
+            rounds=500,
+        )
+
+        assert len(result) == len(cached_films.films)
+
+    def test_hit(self, benchmark, run_async, cached_films):
+        run_async(lambda: cached_films.get_list(1))
+
+        result = benchmark(run_async, lambda: cached_films.get_list(1))
+
+        assert len(result) == len(cached_films.films)
+
+    def test_raw_hit(self, benchmark, run_async, cached_films):
+        run_async(lambda: cached_films.get_list(1))
+
+        result = benchmark(run_async, lambda: cached_films.get_list.raw(1))
+
+        assert result.startswith(b"[")
+
+    def test_local_hit(self, benchmark, run_async, cached_films):
+        run_async(lambda: cached_films.get_local_list(1))
+
+        result = benchmark(
+            run_async, lambda: cached_films.get_local_list(1)
+        )
+
+        assert len(result) == len(cached_films.films)
+
+    def test_many_hit(self, benchmark, run_async, cached_films):
+        film_ids = list(cached_films.details)
+        run_async(lambda: cached_films.get_many(film_ids))
+
+        result = benchmark(
+            run_async, lambda: cached_films.get_many(film_ids)
+        )
+
+        assert len(result) == len(film_ids)
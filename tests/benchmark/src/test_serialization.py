@@ -0,0 +1,52 @@
+import json
+
+import pytest
+
+from fastapi_service.src.models.film import Film
+from fastapi_service.src.services.film import FILM_SEARCH_QUERY
+from fastapi_service.src.utils.serialization import dump_json, from_hits
+
+
+@pytest.fixture
+def hits(dataset) -> list[dict]:
+    return [
+        {"_id": doc["id"], "_source": doc} for doc in dataset["films"][:50]
+    ]
+
+
+class TestSerialization:
+
+    def test_from_hits(self, benchmark, hits):
+        result = benchmark(from_hits, Film, hits)
+
+        assert len(result) == len(hits)
+
+    def test_dump_json(self, benchmark, hits):
+        films = from_hits(Film, hits)
+
+        result = benchmark(dump_json, films, Film)
+
+        assert len(json.loads(result)) == len(films)
+
+    def test_render_query(self, benchmark):
+        result = benchmark(
+            FILM_SEARCH_QUERY.render, query="star wars", offset=0, size=50
+        )
+
+        assert json.loads(result)["size"] == 50
+
+    def test_build_query(self, benchmark):
+        # The same body built as a dict and encoded per call, for comparison.
+        def build() -> bytes:
+            return json.dumps(
+                {
+                    "query": {"multi_match": {"query": "star wars"}},
+                    "_source": ["id", "title", "imdb_rating"],
+                    "from": 0,
+                    "size": 50,
+                }
+            ).encode()
+
+        result = benchmark(build)
+
+        assert json.loads(result)["size"] == 50
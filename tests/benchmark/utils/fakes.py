@@ -0,0 +1,274 @@
+import asyncio
+import json
+
+from fastapi_service.src.db.search_repository import SearchRepository
+
+
+def _field_values(doc: dict, path: str) -> list:
+    values = [doc]
+    for part in path.split("."):
+        nested_values = []
+        for value in values:
+            if isinstance(value, dict) and part in value:
+                field = value[part]
+                nested_values += field if isinstance(field, list) else [field]
+        values = nested_values
+    return values
+
+
+def _tokens(value) -> set[str]:
+    return set(str(value).lower().split())
+
+
+def _select(doc: dict, source: list[str] | None) -> dict:
+    if source is None:
+        return dict(doc)
+    fields = {path.split(".", 1)[0] for path in source}
+    return {field: value for field, value in doc.items() if field in fields}
+
+
+def matches(doc: dict, query: dict | None) -> bool:
+    """Evaluates the subset of the query DSL the services rely on."""
+    if not query or "match_all" in query:
+        return True
+    if "match" in query or "match_phrase" in query:
+        match_query = query.get("match") or query["match_phrase"]
+        ((field, value),) = match_query.items()
+        return any(
+            _tokens(value) & _tokens(actual)
+            for actual in _field_values(doc, field)
+        )
+    if "multi_match" in query:
+        value = query["multi_match"]["query"]
+        return any(
+            _tokens(value) & _tokens(actual)
+            for actual in doc.values()
+            if isinstance(actual, str)
+        )
+    if "terms" in query:
+        ((field, values),) = query["terms"].items()
+        return bool(set(values) & set(_field_values(doc, field)))
+    if "ids" in query:
+        return doc.get("id") in query["ids"]["values"]
+    if "nested" in query:
+        return matches(doc, query["nested"]["query"])
+    if "bool" in query:
+        bool_query = query["bool"]
+        must = bool_query.get("must", []) + bool_query.get("filter", [])
+        should = bool_query.get("should", [])
+        return all(matches(doc, clause) for clause in must) and (
+                not should or any(matches(doc, clause) for clause in should)
+        )
+    raise NotImplementedError(f"Unsupported query: {query}")
+
+
+class InMemorySearchRepository(SearchRepository):
+    """SearchRepository over a list of documents with a simulated latency.
+
+    Every call is counted in ``calls`` so benchmarks can report how many
+    round trips a service method would make against Elasticsearch.
+    """
+
+    def __init__(self, docs: list[dict], latency: float = 0.0):
+        self.docs = {doc["id"]: doc for doc in docs}
+        self.latency = latency
+        self.calls = 0
+
+    async def _round_trip(self) -> None:
+        self.calls += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+    async def search(self, body: dict | bytes) -> list[dict]:
+        await self._round_trip()
+        if isinstance(body, bytes):
+            body = json.loads(body)
+        start = body.get("from", 0)
+        size = body.get("size", 10)
+        found = [
+            doc
+            for doc in self.docs.values()
+            if matches(doc, body.get("query"))
+        ]
+        return [
+            {"_id": doc["id"], "_source": dict(doc)}
+            for doc in found[start:start + size]
+        ]
+
+    async def search_after(
+            self, body: dict, cursor: str | None
+    ) -> tuple[list[dict], str | None]:
+        start = int(cursor or 0)
+        size = body.get("size", 10)
+        hits = await self.search({**body, "from": start})
+        next_cursor = str(start + size) if len(hits) == size else None
+        return hits, next_cursor
+
+    async def get(
+            self, doc_id: str, source: list[str] | None = None
+    ) -> dict:
+        await self._round_trip()
+        if doc_id in self.docs:
+            return _select(self.docs[doc_id], source)
+
+    async def get_many(
+            self, doc_ids: list[str], source: list[str] | None = None
+    ) -> list[dict | None]:
+        await self._round_trip()
+        return [
+            _select(self.docs[doc_id], source) if doc_id in self.docs else None
+            for doc_id in doc_ids
+        ]
+
+
+class FakePipeline:
+    """Queues the calls of a pipeline and runs them on ``execute``."""
+
+    def __init__(self, redis: "FakeRedis"):
+        self.redis = redis
+        self.calls = []
+
+    async def __aenter__(self) -> "FakePipeline":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        for call in self.calls:
+            call.close()
+        self.calls = []
+
+    def __getattr__(self, name: str):
+        method = getattr(self.redis, name)
+
+        def queue(*args, **kwargs) -> "FakePipeline":
+            self.calls.append(method(*args, **kwargs))
+            return self
+
+        return queue
+
+    async def execute(self) -> list:
+        calls, self.calls = self.calls, []
+        return [await call for call in calls]
+
+
+class FakeLock:
+    """A non-blocking lock held in the ``locks`` of its FakeRedis."""
+
+    def __init__(self, redis: "FakeRedis", name: str):
+        self.redis = redis
+        self.name = name
+
+    async def acquire(self) -> bool:
+        if self.name in self.redis.locks:
+            return False
+        self.redis.locks.add(self.name)
+        return True
+
+    async def release(self) -> None:
+        self.redis.locks.discard(self.name)
+
+
+class FakeRedis:
+    """The Redis commands of the cache and the services, kept in dicts.
+
+    Expiry is ignored: entries outlive their TTL, so a benchmark of the
+    cache sees the same hit or miss on every round.
+    """
+
+    def __init__(self):
+        self.data: dict[str, bytes] = {}
+        self.hashes: dict[str, dict[str, bytes]] = {}
+        self.zsets: dict[str, dict[bytes, float]] = {}
+        self.published: list[tuple[str, str]] = []
+        self.locks: set[str] = set()
+
+    @property
+    def _stores(self) -> tuple[dict, ...]:
+        return self.data, self.hashes, self.zsets
+
+    def pipeline(self, transaction: bool = True) -> FakePipeline:  # noqa
+        return FakePipeline(self)
+
+    def lock(self, name: str, **kwargs) -> FakeLock:  # noqa
+        return FakeLock(self, name)
+
+    async def get(self, key: str) -> bytes | None:
+        return self.data.get(key)
+
+    async def mget(self, keys: list[str]) -> list[bytes | None]:
+        return [self.data.get(key) for key in keys]
+
+    async def delete(self, *keys: str) -> int:
+        deleted = 0
+        for key in keys:
+            for store in self._stores:
+                deleted += store.pop(key, None) is not None
+        return deleted
+
+    async def exists(self, *keys: str) -> int:
+        return sum(
+            any(key in store for store in self._stores) for key in keys
+        )
+
+    async def hset(self, key: str, field: str, value: bytes) -> int:
+        self.hashes.setdefault(key, {})[field] = value
+        return 1
+
+    async def hdel(self, key: str, *fields: str) -> int:
+        values = self.hashes.get(key, {})
+        return sum(values.pop(field, None) is not None for field in fields)
+
+    async def hmget(self, key: str, fields: list[str]) -> list[bytes | None]:
+        values = self.hashes.get(key, {})
+        return [values.get(field) for field in fields]
+
+    async def zadd(self, key: str, mapping: dict[str, float]) -> int:
+        members = self.zsets.setdefault(key, {})
+        added = 0
+        for member, score in mapping.items():
+            member = member.encode()
+            added += member not in members
+            members[member] = score
+        return added
+
+    async def zremrangebyscore(
+            self, key: str, min_score: float | str, max_score: float | str
+    ) -> int:
+        members = self.zsets.get(key, {})
+        removed = [
+            member
+            for member, score in members.items()
+            if float(min_score) <= score <= float(max_score)
+        ]
+        for member in removed:
+            del members[member]
+        return len(removed)
+
+    async def zrange(self, key: str, start: int, end: int) -> list[bytes]:
+        members = sorted(
+            self.zsets.get(key, {}).items(), key=lambda item: item[1]
+        )
+        end = len(members) if end == -1 else end + 1
+        return [member for member, _ in members[start:end]]
+
+    async def publish(self, channel: str, message: str) -> int:
+        self.published.append((channel, message))
+        return 0
+
+    async def pexpire(self, key: str, expire_ms: int) -> bool:  # noqa
+        return True
+
+    async def rename(self, key: str, new_key: str) -> bool:
+        for store in self._stores:
+            if key in store:
+                store[new_key] = store.pop(key)
+        return True
+
+    async def set(
+            self,
+            key: str,
+            value,
+            ex: int | None = None,
+            px: int | None = None,
+    ) -> bool:
+        self.data[key] = value if isinstance(value, bytes) else value.encode()
+        return True
@@ -0,0 +1,97 @@
+import random
+import uuid
+from typing import Iterator
+
+from elasticsearch import AsyncElasticsearch
+from elasticsearch.helpers import async_bulk
+
+from tests.functional.utils.random_helper import (
+    generate_films,
+    generate_genres,
+    generate_persons,
+)
+from tests.settings import test_settings
+
+# random_helper builds a Faker per field, so it only generates the pools
+# the seeded documents are drawn from, not every document.
+TEMPLATES_COUNT = 500
+BULK_CHUNK_SIZE = 2000
+
+
+def _sample(rng: random.Random, pool: list[dict], k: int) -> list[dict]:
+    return rng.sample(pool, k=min(k, len(pool)))
+
+
+def generate_person_docs(count: int, rng: random.Random) -> list[dict]:
+    names = [
+        person["name"]
+        for person in generate_persons(min(count, TEMPLATES_COUNT))
+    ]
+    return [
+        {"id": str(uuid.uuid4()), "name": rng.choice(names)}
+        for _ in range(count)
+    ]
+
+
+def generate_film_docs(
+        count: int,
+        genres: list[dict],
+        persons: list[dict],
+        rng: random.Random,
+) -> Iterator[dict]:
+    """Yields films whose genres and people come from the given pools."""
+    templates = generate_films(min(count, TEMPLATES_COUNT))
+    for _ in range(count):
+        template = rng.choice(templates)
+        yield {
+            "id": str(uuid.uuid4()),
+            "title": template["title"],
+            "imdb_rating": round(rng.uniform(0.0, 10.0), 1),
+            "description": template["description"],
+            "genres": [genre["name"] for genre in _sample(rng, genres, 3)],
+            "actors": _sample(rng, persons, rng.randint(1, 5)),
+            "writers": _sample(rng, persons, rng.randint(0, 2)),
+            "directors": _sample(rng, persons, 1),
+        }
+
+
+async def write_index(
+        es_client: AsyncElasticsearch,
+        docs: Iterator[dict],
+        index_mapping: dict[str, dict],
+) -> None:
+    """Recreates the index and bulk loads ``docs`` into it in chunks."""
+    index = index_mapping.get("index_name")
+    schema = index_mapping.get("index_schema")
+    if await es_client.indices.exists(index=index):
+        await es_client.indices.delete(index=index)
+    await es_client.indices.create(index=index, body=schema)
+    await async_bulk(
+        client=es_client,
+        actions=(
+            {"_index": index, "_id": doc["id"], "_source": doc}
+            for doc in docs
+        ),
+        chunk_size=BULK_CHUNK_SIZE,
+    )
+    await es_client.indices.refresh(index=index)
+
+
+async def seed(
+        es_client: AsyncElasticsearch,
+        films_count: int,
+        persons_count: int,
+        genres_count: int,
+        rng: random.Random,
+) -> None:
+    genres = generate_genres(genres_count)
+    persons = generate_person_docs(persons_count, rng)
+    await write_index(es_client, iter(genres), test_settings.es_genre_mapping)
+    await write_index(
+        es_client, iter(persons), test_settings.es_person_mapping
+    )
+    await write_index(
+        es_client,
+        generate_film_docs(films_count, genres, persons, rng),
+        test_settings.es_film_mapping,
+    )
@@ -29,6 +29,20 @@ async def get_request(client_session: ClientSession) -> Callable:
     return inner
 
 
+@pytest_asyncio.fixture
+async def get_response(client_session: ClientSession) -> Callable:
+    """Like ``get_request``, also returning the response headers."""
+
+    async def inner(endpoint: str, params: dict = None):
+        url = urljoin(test_settings.service_url, endpoint)
+        params = params or {}
+        async with client_session.get(url, params=params) as response:
+            body = await response.json()
+            return body, response.status, response.headers
+
+    return inner
+
+
 @pytest_asyncio.fixture
 async def redis_session() -> AsyncGenerator[Redis, None]:
     async with Redis(
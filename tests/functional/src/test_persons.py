@@ -1,3 +1,5 @@
+import base64
+import json
 import uuid
 from http import HTTPStatus
 from random import choice
@@ -11,6 +13,10 @@ from tests.functional.utils.random_helper import (
 from tests.settings import test_settings
 
 
+def _cursor(state: dict) -> str:
+    return base64.urlsafe_b64encode(json.dumps(state).encode()).decode()
+
+
 class TestV1Persons:
     path = "/api/v1/persons"
 
@@ -115,6 +121,62 @@ class TestV1Persons:
         assert total_retrieved == total_count
         assert set(person_ids) == {person["id"] for person in person_data}
 
+    @pytest.mark.asyncio
+    async def test_v1_persons_search_cursor_pagination(
+            self, flush_cache, write_data_to_es, get_response
+    ):
+        total_count = 64
+        person_data = generate_persons(total_count)
+        new_last_name = "Doe"
+        for person in person_data:
+            *first_name, last_name = person["name"].split()
+            person["name"] = f"{' '.join(first_name)} {new_last_name}"
+        await write_data_to_es(person_data, test_settings.es_person_mapping)
+
+        person_ids = []
+        page_size = 10
+        cursor = ""
+
+        while cursor is not None:
+            params = {
+                "query": new_last_name,
+                "page_size": page_size,
+                "cursor": cursor,
+            }
+            response, status, headers = await get_response(
+                self.path + "/search", params=params
+            )
+
+            assert status == HTTPStatus.OK
+            assert len(response) <= page_size
+
+            person_ids += [person["uuid"] for person in response]
+            cursor = headers.get("X-Next-Cursor")
+
+        assert len(person_ids) == total_count
+        assert set(person_ids) == {person["id"] for person in person_data}
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        "cursor",
+        [
+            "not a cursor",
+            _cursor({"pit": "bm90IGEgcGl0IGlk", "after": [1.0, 2]}),
+            _cursor({"pit": "bm90IGEgcGl0IGlk", "after": "1"}),
+        ],
+    )
+    async def test_v1_persons_search_invalid_cursor(
+            self, flush_cache, get_response, cursor
+    ):
+        params = {"query": "Doe", "page_size": 10, "cursor": cursor}
+
+        response, status, headers = await get_response(
+            self.path + "/search", params=params
+        )
+
+        assert status == HTTPStatus.BAD_REQUEST
+        assert "X-Next-Cursor" not in headers
+
     @pytest.mark.asyncio
     async def test_v1_persons_by_person_id(
             self, flush_cache, write_data_to_es, get_request
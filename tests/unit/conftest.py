@@ -0,0 +1,16 @@
+import pytest
+
+from fastapi_service.src.db.local_cache import local_caches
+from tests.benchmark.utils.fakes import FakeRedis
+
+
+@pytest.fixture(autouse=True)
+def flush_cache():
+    """Overrides the Redis flush, the unit tests run on a FakeRedis."""
+    for local_cache in local_caches.values():
+        local_cache.clear()
+
+
+@pytest.fixture
+def fake_redis() -> FakeRedis:
+    return FakeRedis()
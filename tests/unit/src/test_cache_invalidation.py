@@ -0,0 +1,78 @@
+import time
+import uuid
+
+import pytest
+
+from fastapi_service.src.db.cache_invalidation import (
+    _parse_tags,
+    purge,
+    tag_key,
+)
+from fastapi_service.src.db.redis import redis_cache
+from fastapi_service.src.models.genre import Genre
+
+
+def _genre_tags(genre: Genre) -> list[str]:
+    return [f"genre:{genre.id}"]
+
+
+class TaggedGenreLoader:
+    def __init__(self, redis, genre: Genre):
+        self.redis = redis
+        self.genre = genre
+
+    @redis_cache("test_tagged_genre", Genre, local_ttl=60, tags=_genre_tags)
+    async def get_genre(self, name: str) -> Genre:
+        return self.genre
+
+
+@pytest.fixture
+def genre() -> Genre:
+    return Genre(id=uuid.uuid4(), name="Drama")
+
+
+class TestCacheInvalidation:
+
+    @pytest.mark.parametrize(
+        "data, expected",
+        [
+            (b'["film:1", "person:2"]', ["film:1", "person:2"]),
+            (b'"film:1"', ["film:1"]),
+            (b"film:1", ["film:1"]),
+        ],
+    )
+    def test_parse_tags(self, data, expected):
+        assert _parse_tags(data) == expected
+
+    @pytest.mark.asyncio
+    async def test_tags_are_scored_by_expiry(self, fake_redis, genre):
+        loader = TaggedGenreLoader(fake_redis, genre)
+
+        await loader.get_genre("drama")
+
+        members = fake_redis.zsets[tag_key(f"genre:{genre.id}")]
+        assert list(members) == [b"test_tagged_genre:drama"]
+        assert members[b"test_tagged_genre:drama"] > time.time() * 1000
+
+    @pytest.mark.asyncio
+    async def test_expired_tag_members_are_trimmed(self, fake_redis, genre):
+        loader = TaggedGenreLoader(fake_redis, genre)
+        key = tag_key(f"genre:{genre.id}")
+        await fake_redis.zadd(key, {"test_tagged_genre:gone": 1})
+
+        await loader.get_genre("drama")
+
+        assert list(fake_redis.zsets[key]) == [b"test_tagged_genre:drama"]
+
+    @pytest.mark.asyncio
+    async def test_purge(self, fake_redis, genre):
+        loader = TaggedGenreLoader(fake_redis, genre)
+        await loader.get_genre("drama")
+        await fake_redis.set(f"genre:{genre.id}", b"{}")
+
+        purged = await purge(fake_redis, [f"genre:{genre.id}"])
+
+        assert purged == 2
+        assert not fake_redis.data
+        local_cache = loader.get_genre.local_cache
+        assert local_cache.get("test_tagged_genre:drama") is None
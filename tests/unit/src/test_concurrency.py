@@ -0,0 +1,71 @@
+import asyncio
+
+import pytest
+
+from fastapi_service.src.utils.concurrency import gather
+
+
+class Call:
+    """Returns ``value`` after ``delay``, noting whether it was cancelled."""
+
+    def __init__(self, value, delay: float = 0, error: Exception = None):
+        self.value = value
+        self.delay = delay
+        self.error = error
+        self.cancelled = False
+
+    async def __call__(self):
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        if self.error:
+            raise self.error
+        return self.value
+
+
+class TestGather:
+
+    @pytest.mark.asyncio
+    async def test_results_keep_order_of_calls(self):
+        slow, fast = Call("slow", 0.02), Call("fast")
+
+        assert await gather(slow(), fast()) == ["slow", "fast"]
+
+    @pytest.mark.asyncio
+    async def test_failure_cancels_siblings(self):
+        failing = Call(None, error=ValueError("boom"))
+        sibling = Call("sibling", 10)
+
+        with pytest.raises(ValueError, match="boom"):
+            await gather(failing(), sibling())
+
+        assert sibling.cancelled
+
+    @pytest.mark.asyncio
+    async def test_timeout_cancels_calls(self):
+        calls = [Call("first", 10), Call("second", 10)]
+
+        with pytest.raises(TimeoutError):
+            await gather(*(call() for call in calls), timeout=0.01)
+
+        assert all(call.cancelled for call in calls)
+
+    @pytest.mark.asyncio
+    async def test_limiter_is_shared_across_gathers(self):
+        limiter = asyncio.Semaphore(2)
+        running = peak = 0
+
+        async def call():
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+
+        await asyncio.gather(
+            *(gather(call(), call(), limiter=limiter) for _ in range(3))
+        )
+
+        assert peak == 2
@@ -0,0 +1,43 @@
+import pytest
+
+from fastapi_service.src.db.elastic import ElasticsearchRepository
+
+
+class FakeElasticsearch:
+    """Answers mget from ``docs`` in the order of the ids, as ES does."""
+
+    def __init__(self, docs: dict[str, dict]):
+        self.docs = docs
+        self.mgets = []
+
+    async def mget(self, index: str, ids: list[str], **kwargs) -> dict:
+        self.mgets.append(ids)
+        return {
+            "docs": [
+                {"_id": doc_id, "found": True, "_source": self.docs[doc_id]}
+                if doc_id in self.docs
+                else {"_id": doc_id, "found": False}
+                for doc_id in ids
+            ]
+        }
+
+
+class TestElasticsearchRepository:
+
+    @pytest.mark.asyncio
+    async def test_get_many_keeps_order_and_missing_ids(self):
+        client = FakeElasticsearch({"a": {"id": "a"}, "c": {"id": "c"}})
+        elastic = ElasticsearchRepository(client, "test_elastic")
+
+        docs = await elastic.get_many(["c", "b", "a"])
+
+        assert docs == [{"id": "c"}, None, {"id": "a"}]
+        assert client.mgets == [["c", "b", "a"]]
+
+    @pytest.mark.asyncio
+    async def test_get_many_without_ids_skips_request(self):
+        client = FakeElasticsearch({})
+        elastic = ElasticsearchRepository(client, "test_elastic")
+
+        assert await elastic.get_many([]) == []
+        assert client.mgets == []
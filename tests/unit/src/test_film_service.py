@@ -0,0 +1,85 @@
+import uuid
+
+import pytest
+
+from fastapi_service.src.models.film import FilmDetails
+from fastapi_service.src.models.genre import Genre
+from fastapi_service.src.services.film import FilmService
+from tests.benchmark.utils.fakes import InMemorySearchRepository
+
+
+def _films(*titles: str, genres: list[str] = ()) -> list[dict]:
+    return [
+        {
+            "id": str(uuid.uuid4()),
+            "title": title,
+            "imdb_rating": 5.0,
+            "genres": list(genres),
+        }
+        for title in titles
+    ]
+
+
+def _details(film: dict, genres: list[str]) -> FilmDetails:
+    return FilmDetails(
+        uuid=film["id"],
+        title=film["title"],
+        imdb_rating=film["imdb_rating"],
+        description=None,
+        genres=[Genre(id=uuid.uuid4(), name=name) for name in genres],
+        actors=[],
+        writers=[],
+        directors=[],
+    )
+
+
+class TestFilmService:
+
+    @pytest.mark.asyncio
+    async def test_get_many_skips_missing_ids_and_keeps_order(
+            self, fake_redis
+    ):
+        films = _films("First", "Second", "Third")
+        elastic = InMemorySearchRepository(films)
+        film_service = FilmService(fake_redis, elastic, None)
+        first, second, third = (film["id"] for film in films)
+        missing = str(uuid.uuid4())
+
+        found = await film_service.get_many([third, missing, first, second])
+        cached = await film_service.get_many([second, missing, third])
+
+        assert [film.title for film in found] == ["Third", "First", "Second"]
+        assert [film.title for film in cached] == ["Second", "Third"]
+        assert elastic.calls == 2
+
+    @pytest.mark.asyncio
+    async def test_alike_by_genres_skips_film_and_is_cached(
+            self, fake_redis
+    ):
+        films = [
+            *_films("Drama", "Other drama", genres=["Drama"]),
+            *_films("Comedy", genres=["Comedy"]),
+        ]
+        elastic = InMemorySearchRepository(films)
+        film_service = FilmService(fake_redis, elastic, None)
+        film = _details(films[0], ["Drama"])
+
+        alike = await film_service.get_alike_by_genres(film)
+        cached = await film_service.get_alike_by_genres(film)
+
+        assert [other.title for other in alike] == ["Other drama"]
+        assert cached == alike
+        assert elastic.calls == 1
+
+    @pytest.mark.asyncio
+    async def test_alike_without_genres_returns_films(self, fake_redis):
+        films = _films("First", "Second", "Third")
+        film_service = FilmService(
+            fake_redis, InMemorySearchRepository(films), None
+        )
+
+        alike = await film_service.get_alike_by_genres(
+            _details(films[0], [])
+        )
+
+        assert [film.title for film in alike] == ["Second", "Third"]
@@ -0,0 +1,113 @@
+import json
+import random
+
+import pytest
+
+from fastapi_service.src.jobs.films_alike import FilmsAlikeJob
+from tests.benchmark.utils.fakes import FakeRedis, InMemorySearchRepository
+
+
+def _films(count: int, rng: random.Random) -> list[dict]:
+    genres = [f"genre {index}" for index in range(6)]
+    return [
+        {
+            "id": f"film-{index}",
+            "title": f"Film {index}",
+            "imdb_rating": round(rng.uniform(0, 10), 1),
+            "genres": rng.sample(genres, k=rng.randint(0, 3)),
+        }
+        for index in range(count)
+    ]
+
+
+def _job(redis, elastic, candidates: int = 5) -> FilmsAlikeJob:
+    return FilmsAlikeJob(
+        redis, elastic, top_k=3, candidates=candidates, batch_size=7, ttl=60
+    )
+
+
+def _lists(redis: FakeRedis) -> dict[str, list]:
+    return {
+        key: [film["uuid"] for film in json.loads(body)]
+        for key, body in redis.data.items()
+    }
+
+
+class TestFilmsAlikeJob:
+
+    @pytest.mark.asyncio
+    async def test_rebuild_ranks_by_shared_genres_and_rating(self, fake_redis):
+        films = [
+            {"id": "a", "title": "A", "imdb_rating": 1, "genres": ["x", "y"]},
+            {"id": "b", "title": "B", "imdb_rating": 9, "genres": ["x"]},
+            {"id": "c", "title": "C", "imdb_rating": 2, "genres": ["x", "y"]},
+            {"id": "d", "title": "D", "imdb_rating": 7, "genres": ["z"]},
+        ]
+        job = _job(fake_redis, InMemorySearchRepository(films))
+
+        assert await job.rebuild() == len(films)
+
+        assert _lists(fake_redis) == {
+            "alike:a": ["c", "b"],
+            "alike:b": ["c", "a"],
+            "alike:c": ["a", "b"],
+            "alike:d": [],
+        }
+
+    @pytest.mark.asyncio
+    async def test_film_without_genres_gets_best_rated(self, fake_redis):
+        films = [
+            {"id": "a", "title": "A", "imdb_rating": 1, "genres": []},
+            {"id": "b", "title": "B", "imdb_rating": 9, "genres": ["x"]},
+            {"id": "c", "title": "C", "imdb_rating": 5, "genres": ["y"]},
+            {"id": "d", "title": "D", "imdb_rating": 7, "genres": ["z"]},
+            {"id": "e", "title": "E", "imdb_rating": 3, "genres": ["x"]},
+        ]
+        job = _job(fake_redis, InMemorySearchRepository(films))
+
+        await job.rebuild()
+
+        assert _lists(fake_redis)["alike:a"] == ["b", "d", "c"]
+
+    @pytest.mark.asyncio
+    async def test_refresh_matches_rebuild(self, fake_redis):
+        rng = random.Random(0)
+        films = _films(60, rng)
+        elastic = InMemorySearchRepository(films)
+        job = _job(fake_redis, elastic)
+        await job.rebuild()
+
+        for _ in range(30):
+            film_ids = rng.sample(list(elastic.docs), k=2)
+            for film_id in film_ids:
+                action = rng.choice(["rate", "retag", "remove"])
+                if action == "remove":
+                    del elastic.docs[film_id]
+                    continue
+                film = elastic.docs[film_id]
+                film["imdb_rating"] = round(rng.uniform(0, 10), 1)
+                if action == "retag":
+                    film["genres"] = _films(1, rng)[0]["genres"]
+            new_film = _films(1, rng)[0]
+            new_film["id"] = f"new-{len(elastic.docs)}-{rng.random()}"
+            elastic.docs[new_film["id"]] = new_film
+            await job.handle_tags(
+                [f"film:{film_id}" for film_id in [*film_ids, new_film["id"]]]
+            )
+
+            rebuilt = FakeRedis()
+            await _job(rebuilt, elastic).rebuild()
+            assert _lists(fake_redis) == _lists(rebuilt)
+
+    @pytest.mark.asyncio
+    async def test_rebuild_drops_lists_of_removed_films(self, fake_redis):
+        films = _films(10, random.Random(1))
+        elastic = InMemorySearchRepository(films)
+        job = _job(fake_redis, elastic)
+        await job.rebuild()
+
+        del elastic.docs["film-0"]
+        await job.rebuild()
+
+        assert "alike:film-0" not in fake_redis.data
+        assert len(fake_redis.data) == len(films) - 1
@@ -0,0 +1,78 @@
+import asyncio
+import uuid
+
+import pytest
+
+from fastapi_service.src.services.genre_catalogue import GenreCatalogue
+from tests.benchmark.utils.fakes import InMemorySearchRepository
+
+
+def _genre(name: str) -> dict:
+    return {"id": str(uuid.uuid4()), "name": name}
+
+
+class TestGenreCatalogue:
+
+    @pytest.mark.asyncio
+    async def test_load_and_lookups(self):
+        action, drama = _genre("Action"), _genre("Drama")
+        catalogue = GenreCatalogue(
+            InMemorySearchRepository([action, drama]),
+            refresh_interval=60,
+            size=100,
+        )
+
+        await catalogue.load()
+
+        assert catalogue.is_loaded
+        assert [genre.name for genre in catalogue.get_genres()] == [
+            "Action", "Drama"
+        ]
+        assert catalogue.get_by_id(action["id"]).name == "Action"
+        assert catalogue.get_by_id(str(uuid.uuid4())) is None
+        assert [
+            genre.name
+            for genre in catalogue.get_by_names(["drama", "Comedy", "ACTION"])
+        ] == ["Drama", "Action"]
+
+    @pytest.mark.asyncio
+    async def test_failed_start_leaves_catalogue_unloaded(self):
+        elastic = InMemorySearchRepository([])
+
+        async def fail(body):
+            raise ConnectionError
+
+        elastic.search = fail
+        catalogue = GenreCatalogue(elastic, refresh_interval=60, size=100)
+
+        await catalogue.start()
+        await catalogue.stop()
+
+        assert not catalogue.is_loaded
+
+    @pytest.mark.asyncio
+    async def test_refresh_picks_up_changes(self):
+        action = _genre("Action")
+        elastic = InMemorySearchRepository([action])
+        catalogue = GenreCatalogue(elastic, refresh_interval=0, size=100)
+        await catalogue.start()
+
+        elastic.docs[action["id"]] = {**action, "name": "Adventure"}
+        await asyncio.sleep(0.01)
+        await catalogue.stop()
+
+        assert catalogue.get_by_id(action["id"]).name == "Adventure"
+
+    @pytest.mark.asyncio
+    async def test_genre_invalidation_reloads(self):
+        action = _genre("Action")
+        elastic = InMemorySearchRepository([action])
+        catalogue = GenreCatalogue(elastic, refresh_interval=60, size=100)
+        await catalogue.load()
+        del elastic.docs[action["id"]]
+
+        await catalogue.handle_tags([f"film:{uuid.uuid4()}"])
+        assert catalogue.get_by_id(action["id"]) is not None
+
+        await catalogue.handle_tags([f"genre:{action['id']}"])
+        assert catalogue.get_by_id(action["id"]) is None
@@ -0,0 +1,28 @@
+import uuid
+
+import pytest
+
+from fastapi_service.src.services.genre import GenreService
+from tests.benchmark.utils.fakes import InMemorySearchRepository
+
+
+def _genres(*names: str) -> list[dict]:
+    return [{"id": str(uuid.uuid4()), "name": name} for name in names]
+
+
+class TestGenreService:
+
+    @pytest.mark.asyncio
+    async def test_get_by_names_keeps_exact_names_among_partial_matches(
+            self, fake_redis
+    ):
+        genres = _genres(
+            "Action Comedy", "Action Drama", "Action & Adventure", "Action"
+        )
+        genre_service = GenreService(
+            fake_redis, InMemorySearchRepository(genres), None
+        )
+
+        found = await genre_service.get_by_names(["action", "Drama"])
+
+        assert [genre.name for genre in found] == ["Action"]
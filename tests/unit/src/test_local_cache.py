@@ -0,0 +1,89 @@
+from types import SimpleNamespace
+
+import pytest
+
+from fastapi_service.src.db import local_cache as local_cache_module
+from fastapi_service.src.db.local_cache import LocalCache
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch) -> Clock:
+    clock = Clock()
+    monkeypatch.setattr(
+        local_cache_module, "time", SimpleNamespace(monotonic=clock)
+    )
+    return clock
+
+
+def _cache(maxsize: int = 3, ttl: float = 10, max_bytes: int = 100):
+    return LocalCache("test_local_cache", maxsize, ttl, max_bytes)
+
+
+class TestLocalCache:
+
+    def test_evicts_least_recently_used(self, clock):
+        cache = _cache(maxsize=2)
+        cache.set("a", 1, 1)
+        cache.set("b", 2, 1)
+        cache.get("a")
+
+        cache.set("c", 3, 1)
+
+        assert cache.get("a") == 1
+        assert cache.get("b") is None
+        assert cache.get("c") == 3
+        assert cache.stats()["evictions"] == 1
+
+    def test_expires_after_ttl(self, clock):
+        cache = _cache(ttl=10)
+        cache.set("a", 1, 5)
+
+        clock.now += 9.9
+        assert cache.get("a") == 1
+        clock.now += 0.1
+        assert cache.get("a") is None
+
+        assert cache.stats() == {
+            "entries": 0,
+            "size_bytes": 0,
+            "hits": 1,
+            "misses": 1,
+            "evictions": 0,
+        }
+
+    def test_byte_budget(self, clock):
+        cache = _cache(maxsize=10, max_bytes=100)
+        cache.set("a", 1, 40)
+        cache.set("b", 2, 40)
+
+        cache.set("c", 3, 40)
+
+        assert cache.get("a") is None
+        assert cache.stats()["size_bytes"] == 80
+
+    def test_skips_values_over_the_budget(self, clock):
+        cache = _cache(max_bytes=100)
+        cache.set("a", 1, 40)
+
+        cache.set("big", 2, 101)
+
+        assert cache.get("big") is None
+        assert cache.get("a") == 1
+
+    def test_replacing_a_key_recharges_it(self, clock):
+        cache = _cache()
+        cache.set("a", 1, 40)
+
+        cache.set("a", 2, 10)
+        cache.delete("missing")
+
+        assert cache.get("a") == 2
+        assert cache.stats()["size_bytes"] == 10
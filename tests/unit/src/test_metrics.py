@@ -0,0 +1,59 @@
+import pytest
+from prometheus_client import REGISTRY, CollectorRegistry
+
+from fastapi_service.src.core.metrics import (
+    LocalCacheCollector,
+    elastic_callers,
+)
+from fastapi_service.src.db.elastic import ElasticsearchRepository
+from fastapi_service.src.db.local_cache import LocalCache
+
+
+class FakeElasticsearch:
+    async def get(self, index: str, id: str, source_includes=None) -> dict:
+        return {"_source": {"id": id}}
+
+
+@elastic_callers
+class Lookups:
+    def __init__(self, elastic):
+        self.elastic = elastic
+
+    async def outer(self) -> None:
+        await self.elastic.get("doc")
+        await self.inner()
+
+    async def inner(self) -> None:
+        await self.elastic.get("doc")
+
+
+class TestMetrics:
+
+    def test_local_cache_collector(self):
+        cache = LocalCache("test_metrics", maxsize=1, ttl=60, max_bytes=100)
+        cache.set("test_metrics:1", "one", 10)
+        cache.set("test_metrics:2", "two", 20)
+        registry = CollectorRegistry()
+        registry.register(LocalCacheCollector({"test_metrics": cache}))
+
+        def sample(name: str) -> float:
+            return registry.get_sample_value(name, {"cache": "test_metrics"})
+
+        assert sample("local_cache_entries") == 1
+        assert sample("local_cache_size_bytes") == 20
+        assert sample("local_cache_evictions_total") == 1
+
+    @pytest.mark.asyncio
+    async def test_elastic_calls_are_counted_by_innermost_caller(self):
+        elastic = ElasticsearchRepository(FakeElasticsearch(), "test_metrics")
+
+        def count(caller: str) -> float:
+            return REGISTRY.get_sample_value(
+                "elasticsearch_requests_total",
+                {"caller": caller, "method": "get", "index": "test_metrics"},
+            )
+
+        await Lookups(elastic).outer()
+
+        assert count("Lookups.outer") == 1
+        assert count("Lookups.inner") == 1
@@ -0,0 +1,122 @@
+import asyncio
+
+import pytest
+from elastic_transport import ApiResponseMeta, HttpHeaders, NodeConfig
+from elasticsearch import BadRequestError
+
+from fastapi_service.src.db.msearch import MsearchBatcher
+
+
+class MsearchResponse(dict):
+    meta = ApiResponseMeta(
+        status=200,
+        http_version="1.1",
+        headers=HttpHeaders(),
+        duration=0.0,
+        node=NodeConfig("http", "localhost", 9200),
+    )
+
+
+class FakeElasticsearch:
+    """Answers every search with its ``q``, or fails the ones with ``bad``.
+
+    Requests wait for ``release``, so callers can act while they're in
+    flight.
+    """
+
+    def __init__(self):
+        self.batches = []
+        self.release = asyncio.Event()
+        self.release.set()
+
+    async def msearch(self, searches: list[dict], filter_path=None) -> dict:
+        bodies = searches[1::2]
+        self.batches.append([body["q"] for body in bodies])
+        await self.release.wait()
+        return MsearchResponse(
+            responses=[
+                {"status": 400, "error": {"type": "parsing_exception"}}
+                if body.get("bad")
+                else {"status": 200, "hits": {"hits": [body["q"]]}}
+                for body in bodies
+            ]
+        )
+
+
+@pytest.fixture
+def elastic() -> FakeElasticsearch:
+    return FakeElasticsearch()
+
+
+class TestMsearchBatcher:
+
+    @pytest.mark.asyncio
+    async def test_searches_within_window_share_request(self, elastic):
+        batcher = MsearchBatcher(elastic, window=0.01, max_size=10)
+
+        searches = [
+            asyncio.create_task(batcher.search("films", {"q": q}))
+            for q in ("a", "b")
+        ]
+        await asyncio.sleep(0)
+        assert elastic.batches == []
+        responses = await asyncio.gather(*searches)
+
+        assert elastic.batches == [["a", "b"]]
+        assert [response["hits"]["hits"] for response in responses] == [
+            ["a"], ["b"]
+        ]
+
+    @pytest.mark.asyncio
+    async def test_full_batch_is_sent_before_window(self, elastic):
+        batcher = MsearchBatcher(elastic, window=60, max_size=2)
+
+        responses = await asyncio.wait_for(
+            asyncio.gather(
+                batcher.search("films", {"q": "a"}),
+                batcher.search("films", {"q": "b"}),
+            ),
+            timeout=1,
+        )
+
+        assert elastic.batches == [["a", "b"]]
+        assert len(responses) == 2
+
+    @pytest.mark.asyncio
+    async def test_item_error_fails_only_its_caller(self, elastic):
+        batcher = MsearchBatcher(elastic, window=0.01, max_size=10)
+
+        first, bad, last = await asyncio.gather(
+            batcher.search("films", {"q": "a"}),
+            batcher.search("films", {"q": "b", "bad": True}),
+            batcher.search("films", {"q": "c"}),
+            return_exceptions=True,
+        )
+
+        assert first["hits"]["hits"] == ["a"]
+        assert last["hits"]["hits"] == ["c"]
+        assert isinstance(bad, BadRequestError)
+        assert bad.meta.status == 400
+        assert bad.message == "parsing_exception"
+
+    @pytest.mark.asyncio
+    async def test_cancelled_caller_leaves_rest_of_batch(self, elastic):
+        batcher = MsearchBatcher(elastic, window=0.01, max_size=10)
+        elastic.release.clear()
+
+        searches = [
+            asyncio.create_task(batcher.search("films", {"q": q}))
+            for q in ("a", "b", "c")
+        ]
+        while not elastic.batches:
+            await asyncio.sleep(0.001)
+        searches[1].cancel()
+        elastic.release.set()
+        responses = await asyncio.wait_for(
+            asyncio.gather(*searches, return_exceptions=True), timeout=1
+        )
+
+        assert responses[0]["hits"]["hits"] == ["a"]
+        assert isinstance(responses[1], asyncio.CancelledError)
+        assert responses[2]["hits"]["hits"] == ["c"]
+        await batcher.close()
@@ -0,0 +1,39 @@
+import base64
+import json
+
+import pytest
+
+from fastapi_service.src.utils.pagination import (
+    CursorError,
+    decode_cursor,
+    encode_cursor,
+)
+
+
+def _cursor(state) -> str:
+    return base64.urlsafe_b64encode(json.dumps(state).encode()).decode()
+
+
+class TestCursor:
+
+    def test_round_trip(self):
+        cursor = encode_cursor("pit-id", [1.5, "doc", None, 42])
+
+        assert decode_cursor(cursor) == ("pit-id", [1.5, "doc", None, 42])
+
+    @pytest.mark.parametrize(
+        "cursor",
+        [
+            "not base64!",
+            base64.urlsafe_b64encode(b"not json").decode(),
+            _cursor(["pit-id", [1]]),
+            _cursor({"pit": "pit-id"}),
+            _cursor({"pit": 1, "after": [1]}),
+            _cursor({"pit": "", "after": [1]}),
+            _cursor({"pit": "pit-id", "after": "1"}),
+            _cursor({"pit": "pit-id", "after": [{"nested": 1}]}),
+        ],
+    )
+    def test_invalid(self, cursor):
+        with pytest.raises(CursorError):
+            decode_cursor(cursor)
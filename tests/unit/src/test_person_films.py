@@ -0,0 +1,52 @@
+import json
+import uuid
+
+import pytest
+
+from fastapi_service.src.core import config
+from fastapi_service.src.jobs.person_films import PersonFilmsJob
+from fastapi_service.src.services.film import PERSON_FILMS_KEY
+from tests.benchmark.utils.fakes import InMemorySearchRepository
+
+
+def _film(film_id: str, actor_ids: list[str]) -> dict:
+    return {
+        "id": film_id,
+        "actors": [{"id": actor_id} for actor_id in actor_ids],
+        "writers": [],
+        "directors": [],
+    }
+
+
+class TestPersonFilmsJob:
+
+    @pytest.mark.asyncio
+    async def test_refresh_invalidates_affected_persons(self, fake_redis):
+        film_id = str(uuid.uuid4())
+        elastic = InMemorySearchRepository([_film(film_id, ["p1", "p2"])])
+        job = PersonFilmsJob(fake_redis, elastic, batch_size=10)
+        await job.rebuild()
+
+        elastic.docs[film_id] = _film(film_id, ["p2", "p3"])
+        await job.handle_tags([f"film:{film_id}"])
+
+        person_films = fake_redis.hashes[PERSON_FILMS_KEY]
+        assert set(person_films) == {"p2", "p3"}
+        ((channel, message),) = fake_redis.published
+        assert channel == config.CACHE_INVALIDATION_CHANNEL
+        assert set(json.loads(message)) == {
+            "person:p1", "person:p2", "person:p3"
+        }
+
+    @pytest.mark.asyncio
+    async def test_refresh_of_film_without_persons_invalidates_nothing(
+            self, fake_redis
+    ):
+        film_id = str(uuid.uuid4())
+        elastic = InMemorySearchRepository([_film(film_id, [])])
+        job = PersonFilmsJob(fake_redis, elastic, batch_size=10)
+        await job.rebuild()
+
+        await job.handle_tags([f"film:{film_id}"])
+
+        assert not fake_redis.published
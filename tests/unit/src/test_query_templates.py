@@ -0,0 +1,74 @@
+import json
+
+import pytest
+
+from fastapi_service.src.db.query_templates import Param, QueryTemplate
+from fastapi_service.src.services import film
+
+TEMPLATES = {
+    name: value
+    for name, value in vars(film).items()
+    if isinstance(value, QueryTemplate)
+}
+VALUES = {
+    "query": "star wars",
+    "offset": 20,
+    "size": 10,
+    "sort": [{"imdb_rating": {"order": "desc"}}],
+    "genre": "Sci-Fi",
+    "name": "George Lucas",
+    "person_ids": ["a", "b"],
+    "should": [{"match": {"genres": "Drama"}}],
+}
+SEARCH_QUERY = QueryTemplate(
+    {"query": {"match": {"title": Param("query")}}, "size": 10}
+)
+
+
+def _fill(value, params: dict):
+    if isinstance(value, dict):
+        return {key: _fill(item, params) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_fill(item, params) for item in value]
+    return params.get(value, value) if isinstance(value, str) else value
+
+
+class TestQueryTemplate:
+
+    @pytest.mark.parametrize("name", sorted(TEMPLATES))
+    def test_render_matches_json_dumps(self, name):
+        template = TEMPLATES[name]
+        markers = {param: f"<{param}>" for param in template.params}
+        body = json.loads(template.render(**markers))
+        params = {param: VALUES[param] for param in template.params}
+
+        filled = _fill(
+            body, {markers[param]: value for param, value in params.items()}
+        )
+
+        assert template.render(**params) == json.dumps(
+            filled, separators=(",", ":")
+        ).encode()
+
+    @pytest.mark.parametrize(
+        "query",
+        [
+            'x"}},"size":10000,"q":{"a":"',
+            "x\\\\",
+            '\\"}}',
+            "Амели ☃  ",
+        ],
+    )
+    def test_value_stays_in_its_slot(self, query):
+        body = json.loads(SEARCH_QUERY.render(query=query))
+
+        assert body == {"query": {"match": {"title": query}}, "size": 10}
+
+    def test_encoded_bytes_are_taken_as_is(self):
+        template = QueryTemplate({"sort": Param("sort")})
+
+        assert template.render(sort=b'["_score"]') == b'{"sort":["_score"]}'
+
+    def test_missing_param_raises(self):
+        with pytest.raises(TypeError, match="query"):
+            SEARCH_QUERY.render()
@@ -0,0 +1,204 @@
+import asyncio
+import time
+import uuid
+
+import pytest
+
+from fastapi_service.src.db import redis
+from fastapi_service.src.db.codec import (
+    EntryCodec,
+    JsonCodec,
+    ZlibCompressor,
+)
+from fastapi_service.src.db.redis import (
+    entry_codec,
+    redis_cache,
+    redis_cache_many,
+)
+from fastapi_service.src.models.genre import Genre
+
+
+class GenreLoader:
+    """Loads the genres it is given, after ``release`` is set."""
+
+    def __init__(self, redis, genres: list[Genre]):
+        self.redis = redis
+        self.genres = genres
+        self.calls = 0
+        self.release = asyncio.Event()
+        self.release.set()
+
+    @redis_cache("test_genres", Genre, early_refresh_beta=0)
+    async def get_genres(self, name: str) -> list[Genre]:
+        self.calls += 1
+        await self.release.wait()
+        return self.genres
+
+
+class LockedGenreLoader(GenreLoader):
+    @redis_cache("test_locked_genres", Genre, lock_timeout=1)
+    async def get_genres(self, name: str) -> list[Genre]:
+        self.calls += 1
+        return self.genres
+
+
+class LocalGenreLoader(GenreLoader):
+    @redis_cache("test_local_genres", Genre, local_ttl=60)
+    async def get_genres(self, name: str) -> list[Genre]:
+        return self.genres
+
+
+class GenreBatchLoader:
+    """Loads the genres it has among the ids, in reverse order."""
+
+    def __init__(self, redis, genres: list[Genre]):
+        self.redis = redis
+        self.genres = {str(genre.id): genre for genre in genres}
+        self.calls = []
+
+    @redis_cache_many("test_genre_batch", Genre, early_refresh_beta=0)
+    async def get_many(self, ids: list[str]) -> list[Genre]:
+        self.calls.append(ids)
+        return [
+            self.genres[doc_id]
+            for doc_id in reversed(ids)
+            if doc_id in self.genres
+        ]
+
+
+def _stale_entry(genres: list[Genre]) -> bytes:
+    payload = entry_codec.codec.dumps(
+        [genre.model_dump(mode="json", by_alias=True) for genre in genres]
+    )
+    return entry_codec.pack(payload, time.time() - 1, 0.0)
+
+
+@pytest.fixture
+def genres() -> list[Genre]:
+    return [Genre(id=uuid.uuid4(), name="Drama")]
+
+
+class TestRedisCache:
+
+    @pytest.mark.asyncio
+    async def test_miss_joining_refresh_gets_result(self, fake_redis, genres):
+        loader = GenreLoader(fake_redis, genres)
+        fake_redis.data["test_genres:drama"] = _stale_entry(genres)
+        loader.release.clear()
+
+        stale = await loader.get_genres("drama")
+        await fake_redis.delete("test_genres:drama")
+        miss = asyncio.create_task(loader.get_genres("drama"))
+        await asyncio.sleep(0)
+        loader.release.set()
+
+        assert stale == genres
+        assert await miss == genres
+        assert loader.calls == 1
+
+    @pytest.mark.asyncio
+    async def test_missing_refresh_drops_stale_entry(
+            self, fake_redis, genres
+    ):
+        loader = GenreLoader(fake_redis, None)
+        fake_redis.data["test_genres:drama"] = _stale_entry(genres)
+
+        stale = await loader.get_genres("drama")
+        await asyncio.sleep(0.01)
+
+        assert stale == genres
+        assert "test_genres:drama" not in fake_redis.data
+
+    @pytest.mark.asyncio
+    async def test_empty_result_is_cached(self, fake_redis):
+        loader = GenreLoader(fake_redis, [])
+
+        assert await loader.get_genres("drama") == []
+        assert await loader.get_genres.raw("drama") == b"[]"
+        assert "test_genres:drama" in fake_redis.data
+        assert loader.calls == 1
+
+    @pytest.mark.asyncio
+    async def test_local_cache_charges_uncompressed_body(
+            self, fake_redis, monkeypatch
+    ):
+        monkeypatch.setattr(
+            redis,
+            "entry_codec",
+            EntryCodec(JsonCodec(), ZlibCompressor(), compress_threshold=0),
+        )
+
+        genres = [Genre(id=uuid.uuid4(), name="Drama")] * 50
+        loader = LocalGenreLoader(fake_redis, genres)
+        local_cache = loader.get_genres.local_cache
+
+        await loader.get_genres("drama")
+        loaded_size = local_cache.size_bytes
+        local_cache.clear()
+        body = await loader.get_genres.raw("drama")
+
+        assert loaded_size == local_cache.size_bytes == len(body)
+        assert len(fake_redis.data["test_local_genres:drama"]) < len(body)
+
+    @pytest.mark.asyncio
+    async def test_malformed_entry_under_lock_is_loaded(
+            self, fake_redis, genres, monkeypatch
+    ):
+        monkeypatch.setattr(redis.config, "CACHE_LOCK_POLL_INTERVAL", 0.001)
+        loader = LockedGenreLoader(fake_redis, genres)
+        fake_redis.locks.add("lock:test_locked_genres:drama")
+        fake_redis.data["test_locked_genres:drama"] = b"not an entry"
+
+        assert await loader.get_genres("drama") == genres
+        assert loader.calls == 1
+
+
+@pytest.fixture
+def batch() -> list[Genre]:
+    return [
+        Genre(id=uuid.uuid4(), name=name)
+        for name in ("Drama", "Comedy", "Horror")
+    ]
+
+
+class TestRedisCacheMany:
+
+    @pytest.mark.asyncio
+    async def test_all_misses_load_once(self, fake_redis, batch):
+        loader = GenreBatchLoader(fake_redis, batch[:2])
+        ids = [str(genre.id) for genre in batch]
+
+        assert await loader.get_many(ids) == batch[:2]
+        assert loader.calls == [ids]
+        assert sorted(fake_redis.data) == sorted(
+            f"test_genre_batch:{genre.id}" for genre in batch[:2]
+        )
+
+    @pytest.mark.asyncio
+    async def test_partial_hits_load_only_missing_ids(
+            self, fake_redis, batch
+    ):
+        loader = GenreBatchLoader(fake_redis, batch)
+        first, second, third = (str(genre.id) for genre in batch)
+        await loader.get_many([second])
+
+        result = await loader.get_many([third, second, first])
+
+        assert result == [batch[2], batch[1], batch[0]]
+        assert loader.calls == [[second], [third, first]]
+
+    @pytest.mark.asyncio
+    async def test_results_follow_order_of_ids(self, fake_redis, batch):
+        loader = GenreBatchLoader(fake_redis, batch)
+        ids = [str(genre.id) for genre in batch]
+        await loader.get_many(ids[:1])
+
+        shuffled = [ids[1], ids[0], ids[2], ids[1]]
+
+        assert await loader.get_many(shuffled) == [
+            batch[1], batch[0], batch[2]
+        ]
+        assert await loader.get_many(shuffled) == [
+            batch[1], batch[0], batch[2]
+        ]
+        assert len(loader.calls) == 2
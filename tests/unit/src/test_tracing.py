@@ -0,0 +1,139 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from fastapi_service.src.core import tracing
+from fastapi_service.src.core.tracing import (
+    Span,
+    SpanExporter,
+    Trace,
+    TracingMiddleware,
+    server_timing,
+)
+from fastapi_service.src.main import app as service_app
+
+TRACE_ID = "0af7651916cd43dd8448eb211c80319c"
+PARENT_ID = "b7ad6b7169203331"
+
+
+@pytest.fixture
+def enabled(monkeypatch):
+    monkeypatch.setattr(tracing.config, "TRACING_ENABLED", True)
+
+
+def _service():
+    @tracing.traced_methods
+    class Service:
+        async def outer(self) -> str:
+            await self.inner()
+            return "done"
+
+        async def inner(self) -> None:
+            await asyncio.sleep(0)
+
+    return Service()
+
+
+def _span(name: str, duration_ms: float) -> Span:
+    span = Span(Trace(), name, None)
+    span.start, span.end = 0, int(duration_ms * 1e6)
+    return span
+
+
+class TestTracing:
+
+    @pytest.mark.asyncio
+    async def test_spans_nest_under_caller(self, enabled):
+        service = _service()
+        trace = Trace()
+        root = Span(trace, "root", None)
+        token = tracing._current_span.set(root)
+        try:
+            assert await service.outer() == "done"
+        finally:
+            tracing._current_span.reset(token)
+
+        inner, outer = trace.spans
+        assert [inner.name, outer.name] == ["Service.inner", "Service.outer"]
+        assert inner.parent_id == outer.span_id
+        assert outer.parent_id == root.span_id
+
+    def test_disabled_tracing_leaves_functions_as_is(self):
+        async def call() -> None:
+            pass
+
+        assert tracing.traced("call")(call) is call
+
+    def test_server_timing_sums_spans_by_name(self):
+        spans = [
+            _span("cache.film", 1.5),
+            _span("FilmService.search", 4),
+            _span("cache.film", 2),
+        ]
+
+        assert server_timing(spans, 12.345) == (
+            'cache.film;dur=3.5;desc="2x", '
+            'FilmService.search;dur=4.0;desc="1x", '
+            "total;dur=12.3"
+        )
+
+    @pytest.mark.parametrize(
+        "header, expected",
+        [
+            (f"00-{TRACE_ID}-{PARENT_ID}-01", (TRACE_ID, PARENT_ID)),
+            (f"00-{TRACE_ID.upper()}-{PARENT_ID}-01", (None, None)),
+            (f"00-{TRACE_ID}-{PARENT_ID}", (None, None)),
+            (f"00-{TRACE_ID[:-1]}-{PARENT_ID}-01", (None, None)),
+            ("garbage", (None, None)),
+        ],
+    )
+    def test_parse_traceparent(self, header, expected):
+        scope = {"headers": [(b"traceparent", header.encode())]}
+
+        assert tracing._parse_traceparent(scope) == expected
+
+    @pytest.mark.asyncio
+    async def test_middleware_times_and_exports_request(
+            self, enabled, tmp_path
+    ):
+        service = _service()
+        app = FastAPI()
+
+        @app.get("/items/{item_id}")
+        async def get_item(item_id: str) -> str:
+            return await service.outer()
+
+        export_path = tmp_path / "spans.jsonl"
+        app.add_middleware(
+            TracingMiddleware, exporter=SpanExporter(str(export_path))
+        )
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(
+                transport=transport, base_url="http://test"
+        ) as client:
+            response = await client.get(
+                "/items/1",
+                headers={"traceparent": f"00-{TRACE_ID}-{PARENT_ID}-01"},
+            )
+
+        timing = response.headers["Server-Timing"]
+        assert "Service.outer;dur=" in timing
+        assert timing.split(", ")[-1].startswith("total;dur=")
+        spans = [
+            json.loads(line) for line in export_path.read_text().splitlines()
+        ]
+        assert [span["name"] for span in spans] == [
+            "Service.inner", "Service.outer", "GET /items/{item_id}"
+        ]
+        assert {span["traceId"] for span in spans} == {TRACE_ID}
+        assert spans[-1]["parentSpanId"] == PARENT_ID
+
+    def test_app_without_tracing_sends_no_header(self):
+        response = TestClient(service_app).get("/api/openapi.json")
+
+        assert response.status_code == 200
+        assert "Server-Timing" not in response.headers